@@ -0,0 +1,290 @@
+# Benchmarks reproduzíveis do pipeline de conversão e exportação do TFT Screen Layout Helper.
+# Usa imagens sintéticas nos tamanhos de display mais comuns, mede tempo, pico de memória e bytes gerados,
+# guarda uma linha de base (baseline) e falha quando algum caso regride.
+# Desenvolvido por Luiz F. R. Pimentel
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+from export import build_internal_memory_code, image_to_rgb565, load_resized_image, write_sd_card_files
+
+PANEL_SIZES = ((135, 240), (240, 320), (320, 480), (480, 800))  # (largura, altura) dos displays.
+ELEMENT_COUNTS = (1, 10, 50, 200)
+QUICK_PANEL_SIZES = ((135, 240), (240, 320))
+QUICK_ELEMENT_COUNTS = (1, 10)
+ICON_DIVISOR = 8  # Cada ícone mede 1/8 da largura e da altura do display.
+SOURCE_SCALE = 2  # As imagens de origem têm o dobro do tamanho final, para exercitar o redimensionamento.
+# Origem de 20 MP (acima de STREAMING_THRESHOLD_PIXELS) em tela cheia no maior display: exercita o
+# redimensionamento por faixas, onde o pico de memória é o que importa. Só roda sem --quick.
+LARGE_SOURCE_SIZE = (5000, 4000)
+LARGE_SOURCE_PANEL = (480, 800)
+LARGE_SOURCE_STAGES = ('resize_image', 'generate_internal_memory_code', 'generate_sd_card_files')
+
+DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+MIN_CASE_TIME_S = 1.0  # Cada caso se repete até somar pelo menos esse tempo (e ao menos --repeat vezes).
+MAX_CASE_RUNS = 100
+TIME_TOLERANCE = 0.25  # Regressão de tempo aceita (25%) sobre a mediana.
+TIME_NOISE_FLOOR_S = 0.020  # Diferenças de tempo abaixo disso são ruído, qualquer que seja a porcentagem.
+MEMORY_TOLERANCE = 0.10  # Regressão de pico de memória (RSS) aceita (10%).
+MEMORY_NOISE_FLOOR_BYTES = 1024 * 1024
+
+# --- Imagens e Layouts Sintéticos ---
+
+def make_synthetic_image(filepath, width, height, transparent):
+    """Cria uma imagem determinística (gradiente com formas) e, opcionalmente, com áreas transparentes."""
+    red = Image.linear_gradient("L").resize((width, height))
+    green = red.transpose(Image.Transpose.ROTATE_90).resize((width, height))
+    blue = Image.radial_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (red, green, blue)).convert("RGBA")
+    draw = ImageDraw.Draw(image)
+    for i in range(0, min(width, height) // 2, max(min(width, height) // 10, 2)):
+        draw.rectangle((i, i, width - 1 - i, height - 1 - i), outline=(255 - i % 256, i % 256, 128, 255))
+    if transparent:
+        # Elipse opaca sobre fundo transparente, como um ícone típico.
+        alpha = Image.new("L", (width, height), 0)
+        ImageDraw.Draw(alpha).ellipse((0, 0, width - 1, height - 1), fill=255)
+        image.putalpha(alpha)
+    image.save(filepath)
+    return filepath
+
+def make_layout(folder, panel_w, panel_h, element_count, transparent):
+    """Monta a lista de elementos: um fundo em tela cheia e (element_count - 1) ícones em grade."""
+    background = make_synthetic_image(os.path.join(folder, f"bg_{panel_w}x{panel_h}.png"),
+                                      panel_w * SOURCE_SCALE, panel_h * SOURCE_SCALE, False)
+    icon_w, icon_h = max(panel_w // ICON_DIVISOR, 1), max(panel_h // ICON_DIVISOR, 1)
+    icon = make_synthetic_image(os.path.join(folder, f"icon_{panel_w}x{panel_h}_{int(transparent)}.png"),
+                                icon_w * SOURCE_SCALE, icon_h * SOURCE_SCALE, transparent)
+
+    elements = [{'name': "img_1_background.png", 'path': background, 'x': 0, 'y': 0, 'w': panel_w, 'h': panel_h}]
+    for i in range(1, element_count):
+        cell = (i - 1) % (ICON_DIVISOR * ICON_DIVISOR)
+        elements.append({'name': f"img_{i + 1}_icon{i}.png", 'path': icon,
+                         'x': (cell % ICON_DIVISOR) * icon_w, 'y': (cell // ICON_DIVISOR) * icon_h, 'w': icon_w, 'h': icon_h})
+    return elements
+
+def make_large_source_layout(folder):
+    """Monta um layout com um único fundo em tela cheia, gerado a partir de uma origem muito grande."""
+    panel_w, panel_h = LARGE_SOURCE_PANEL
+    source = make_synthetic_image(os.path.join(folder, "large_source.png"), *LARGE_SOURCE_SIZE, False)
+    return [{'name': "img_1_large.png", 'path': source, 'x': 0, 'y': 0, 'w': panel_w, 'h': panel_h}]
+
+# --- Estágios Medidos ---
+
+# Cada estágio recebe o caso (elementos, transparência e imagens já redimensionadas) e a pasta de saída,
+# e retorna a quantidade de bytes produzidos.
+
+def stage_resize(case, output_folder):
+    for element in case['elements']:
+        load_resized_image(element['path'], element['w'], element['h'])
+    return 0
+
+def stage_convert(case, output_folder):
+    return sum(len(image_to_rgb565(image, case['use_transparency'])) * 2 for image in case['images'])
+
+def stage_internal_export(case, output_folder):
+    return len(build_internal_memory_code(case['elements'], case['use_transparency']).encode())
+
+def stage_sd_export(case, output_folder):
+    write_sd_card_files(case['elements'], case['use_transparency'], output_folder)
+    return sum(os.path.getsize(os.path.join(output_folder, name)) for name in os.listdir(output_folder))
+
+STAGES = {
+    'resize_image': stage_resize,
+    'convert_image_data': stage_convert,
+    'generate_internal_memory_code': stage_internal_export,
+    'generate_sd_card_files': stage_sd_export
+}
+
+def measure_time(stage, case, repeat):
+    """Executa um estágio até somar MIN_CASE_TIME_S (e ao menos 'repeat' vezes). Retorna (tempos, bytes gerados)."""
+    times = []
+    while len(times) < repeat or (sum(times) < MIN_CASE_TIME_S and len(times) < MAX_CASE_RUNS):
+        with tempfile.TemporaryDirectory() as output_folder:
+            gc.collect()
+            start = time.perf_counter()
+            output_bytes = stage(case, output_folder)
+            times.append(time.perf_counter() - start)
+    return times, output_bytes
+
+def measure_memory(stage_name, case):
+    """Mede, em um processo separado, quanto o pico de RSS cresce durante um estágio.
+
+    O tracemalloc não enxerga os buffers de pixels do Pillow, então a memória é medida pelo
+    sistema operacional, em um processo novo para cada caso. Retorna None se a plataforma não
+    permitir a medição (Windows, contêineres restritos) ou se o processo de medição falhar.
+    """
+    probe = {'stage': stage_name, 'elements': case['elements'], 'use_transparency': case['use_transparency']}
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--memory-probe"],
+                            input=json.dumps(probe), capture_output=True, text=True)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        print(f"memory probe failed ({stage_name}): {error[-1] if error else result.returncode}", file=sys.stderr)
+        return None
+    return json.loads(result.stdout)['peak_rss_bytes']
+
+def reset_peak_rss():
+    """Zera o pico de RSS (VmHWM) do processo no Linux. Retorna False se o sistema não permitir."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def read_proc_status_kb(field):
+    """Lê um campo em KB (VmRSS, VmHWM) de /proc/self/status."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+def run_memory_probe():
+    """Executa um único estágio (lido da entrada padrão) e imprime o crescimento do pico de RSS.
+
+    No Linux, o ru_maxrss do processo filho já começa com o pico do processo pai (herdado no
+    fork/exec), então o pico (VmHWM) é zerado via /proc/self/clear_refs antes do estágio; se isso
+    não for permitido, a medição é None.
+    """
+    probe = json.load(sys.stdin)
+    case = {'elements': probe['elements'], 'use_transparency': probe['use_transparency'], 'images': []}
+    if probe['stage'] == 'convert_image_data':
+        case['images'] = [load_resized_image(e['path'], e['w'], e['h']) for e in case['elements']]
+    
+    with tempfile.TemporaryDirectory() as output_folder:
+        gc.collect()
+        if sys.platform.startswith("linux"):
+            peak_kb = None
+            if reset_peak_rss():
+                before = read_proc_status_kb("VmRSS")
+                STAGES[probe['stage']](case, output_folder)
+                peak_kb = read_proc_status_kb("VmHWM") - before
+        else:
+            try:
+                import resource
+            except ImportError:
+                peak_kb = None # Windows: sem medição de memória.
+            else:
+                # ru_maxrss vem em KB no Linux e em bytes no macOS.
+                unit = 1024 if sys.platform == "darwin" else 1
+                before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                STAGES[probe['stage']](case, output_folder)
+                peak_kb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) // unit
+    print(json.dumps({'peak_rss_bytes': None if peak_kb is None else peak_kb * 1024}))
+    return 0
+
+def measure(stage_name, case, repeat):
+    """Mede um estágio: mediana e mínimo do tempo, crescimento do pico de RSS e bytes gerados."""
+    times, output_bytes = measure_time(STAGES[stage_name], case, repeat)
+    return {'median_time_s': round(statistics.median(times), 4), 'min_time_s': round(min(times), 4), 'runs': len(times),
+            'peak_rss_bytes': measure_memory(stage_name, case), 'output_bytes': output_bytes}
+
+def print_result(key, result):
+    """Imprime uma linha de resultado: caso, mediana do tempo, crescimento do pico de RSS e bytes gerados."""
+    rss = "n/a" if result['peak_rss_bytes'] is None else f"{result['peak_rss_bytes'] / 1024:.0f} KB"
+    print(f"{key:<60} {result['median_time_s']:>9.4f} s {rss:>11} {result['output_bytes']:>12} B", flush=True)
+
+# --- Linha de Base e Regressões ---
+
+def load_baseline(filepath):
+    try:
+        with open(filepath, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def exceeds(current, previous, tolerance, noise_floor):
+    """Indica se 'current' piorou além da tolerância relativa e do piso absoluto de ruído."""
+    return current - previous > noise_floor and current > previous * (1 + tolerance)
+
+def find_regressions(results, baseline, time_tolerance, memory_tolerance):
+    """Compara os resultados com a linha de base e retorna a lista de regressões encontradas.
+
+    Métricas ausentes na linha de base (por exemplo, de uma versão anterior deste script) são ignoradas.
+    """
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if not previous: continue
+        # Ruído da máquina desloca a mediana, mas raramente o mínimo de muitas execuções; uma regressão real move os dois.
+        if ('median_time_s' in previous
+                and exceeds(current['median_time_s'], previous['median_time_s'], time_tolerance, TIME_NOISE_FLOOR_S)
+                and exceeds(current['min_time_s'], previous['min_time_s'], time_tolerance, TIME_NOISE_FLOOR_S)):
+            regressions.append(f"{case}: time {previous['median_time_s']:.4f}s -> {current['median_time_s']:.4f}s")
+        if (current['peak_rss_bytes'] is not None and previous.get('peak_rss_bytes') is not None
+                and exceeds(current['peak_rss_bytes'], previous['peak_rss_bytes'], memory_tolerance, MEMORY_NOISE_FLOOR_BYTES)):
+            regressions.append(f"{case}: peak RSS {previous['peak_rss_bytes']} -> {current['peak_rss_bytes']} bytes")
+        if current['output_bytes'] != previous['output_bytes']:
+            regressions.append(f"{case}: output bytes {previous['output_bytes']} -> {current['output_bytes']}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de conversão e exportação.")
+    parser.add_argument("--quick", action="store_true", help="Roda só os displays e quantidades de elementos menores.")
+    parser.add_argument("--stage", action="append", choices=sorted(STAGES), help="Estágio a medir (pode repetir; padrão: todos).")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções mínimas por caso; vale a mediana.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Arquivo JSON da linha de base.")
+    parser.add_argument("--update-baseline", action="store_true", help="Grava os resultados como nova linha de base.")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--output", help="Salva os resultados desta execução em JSON.")
+    parser.add_argument("--memory-probe", action="store_true", help=argparse.SUPPRESS)  # Uso interno de measure_memory.
+    args = parser.parse_args(argv)
+    if args.memory_probe:
+        return run_memory_probe()
+
+    panel_sizes = QUICK_PANEL_SIZES if args.quick else PANEL_SIZES
+    element_counts = QUICK_ELEMENT_COUNTS if args.quick else ELEMENT_COUNTS
+    stages = args.stage or list(STAGES)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as image_folder:
+        for panel_w, panel_h in panel_sizes:
+            for transparent in (False, True):
+                for element_count in element_counts:
+                    elements = make_layout(image_folder, panel_w, panel_h, element_count, transparent)
+                    case = {'elements': elements, 'use_transparency': transparent, 'images': []}
+                    if 'convert_image_data' in stages:
+                        # A conversão é medida isoladamente, sobre imagens já redimensionadas.
+                        case['images'] = [load_resized_image(e['path'], e['w'], e['h']) for e in elements]
+                    for stage_name in stages:
+                        key = f"{stage_name}/{panel_w}x{panel_h}/{'alpha' if transparent else 'opaque'}/{element_count}"
+                        results[key] = result = measure(stage_name, case, args.repeat)
+                        print_result(key, result)
+        if not args.quick:
+            case = {'elements': make_large_source_layout(image_folder), 'use_transparency': False, 'images': []}
+            for stage_name in [s for s in stages if s in LARGE_SOURCE_STAGES]:
+                key = f"{stage_name}/large_source/opaque/1"
+                results[key] = result = measure(stage_name, case, args.repeat)
+                print_result(key, result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline or not baseline:
+        # Sem linha de base (primeira execução), os resultados atuais passam a ser a referência.
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(results)} cases, {len(regressions)} regressions")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
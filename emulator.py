@@ -0,0 +1,305 @@
+# Emulador (no computador) do subconjunto da TFT_eSPI usado pelo código gerado pelo TFT Screen Layout Helper.
+# Reproduz o drawLayout de um header (.h) ou o layout JSON + arquivos .RAW do cartão SD em um framebuffer,
+# compara o resultado pixel a pixel com o canvas e contabiliza pixels e transações para estimar o tempo SPI.
+# Desenvolvido por Luiz F. R. Pimentel
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from array import array
+
+from export import (DEFAULT_BUDGET_SETTINGS, STREAMING_THRESHOLD_PIXELS, TRANSPARENCY_KEY_COLOR, build_internal_memory_code,
+                    image_to_rgb565, load_layout_file, load_resized_image, write_sd_card_files)
+
+# Cores nomeadas da TFT_eSPI aceitas nas chamadas de preenchimento.
+TFT_COLORS = {
+    "TFT_BLACK": 0x0000, "TFT_WHITE": 0xFFFF, "TFT_RED": 0xF800, "TFT_GREEN": 0x07E0,
+    "TFT_BLUE": 0x001F, "TFT_YELLOW": 0xFFE0, "TFT_CYAN": 0x07FF, "TFT_MAGENTA": 0xF81F
+}
+
+# Diferença máxima aceita (por canal, em níveis RGB565) quando a geração redimensiona por faixas:
+# o arredondamento muda 1 nível em pixels esparsos (veja _iter_resized_bands).
+STREAM_TOLERANCE_LEVELS = 1
+
+def swap_bytes(value):
+    """Troca os dois bytes de um valor de 16 bits."""
+    return ((value >> 8) | (value << 8)) & 0xFFFF
+
+class TFTEmulator:
+    """Framebuffer RGB565 com as chamadas da TFT_eSPI emitidas pelo gerador.
+
+    O framebuffer guarda a cor exibida. Como no ESP32 (little-endian), os arrays uint16_t só
+    aparecem com as cores corretas depois de setSwapBytes(true); sem isso os bytes saem trocados.
+    """
+    def __init__(self, width, height, spi_clock_hz=None, call_overhead_us=None):
+        self.width = width
+        self.height = height
+        self.spi_clock_hz = spi_clock_hz or DEFAULT_BUDGET_SETTINGS["spi_clock_hz"]
+        self.call_overhead_us = DEFAULT_BUDGET_SETTINGS["call_overhead_us"] if call_overhead_us is None else call_overhead_us
+        self.framebuffer = array('H', [0]) * (width * height)
+        self.swap = False
+        self.pixels_sent = 0
+        self.transactions = 0
+        self.calls = 0
+
+    def setSwapBytes(self, swap):
+        self.swap = bool(swap)
+
+    def fillScreen(self, color):
+        self.fillRect(0, 0, self.width, self.height, color)
+
+    def fillRect(self, x, y, w, h, color):
+        self.calls += 1
+        x0, y0, x1, y1 = self._clip(x, y, w, h)
+        if x1 <= x0 or y1 <= y0: return
+
+        row = array('H', [color & 0xFFFF]) * (x1 - x0)
+        for py in range(y0, y1):
+            start = py * self.width + x0
+            self.framebuffer[start:start + len(row)] = row
+        self.pixels_sent += (x1 - x0) * (y1 - y0)
+        self.transactions += 1
+
+    def pushImage(self, x, y, w, h, data, transp=None):
+        """Desenha uma imagem; com 'transp', cada sequência de pixels opacos é uma transação."""
+        self.calls += 1
+        x0, y0, x1, y1 = self._clip(x, y, w, h)
+        if x1 <= x0 or y1 <= y0: return
+        if transp is not None and not self.swap:
+            # Como na TFT_eSPI: sem setSwapBytes(true), a cor chave é trocada antes da comparação.
+            transp = swap_bytes(transp)
+
+        for py in range(y0, y1):
+            src = (py - y) * w
+            dst = py * self.width
+            if transp is None:
+                row = data[src + x0 - x:src + x1 - x]
+                if not self.swap:
+                    row = [swap_bytes(p) for p in row]
+                self.framebuffer[dst + x0:dst + x1] = array('H', row)
+                continue
+            in_run = False
+            for px in range(x0, x1):
+                p = data[src + px - x]
+                # A comparação usa o valor armazenado, antes da troca de bytes dos pixels.
+                if p == transp:
+                    in_run = False
+                    continue
+                if not in_run:
+                    self.transactions += 1
+                    in_run = True
+                self.framebuffer[dst + px] = p if self.swap else swap_bytes(p)
+                self.pixels_sent += 1
+        if transp is None:
+            self.pixels_sent += (x1 - x0) * (y1 - y0)
+            self.transactions += 1
+
+    def _clip(self, x, y, w, h):
+        """Recorta um retângulo aos limites da tela."""
+        return max(x, 0), max(y, 0), min(x + w, self.width), min(y + h, self.height)
+
+    def spi_time_us(self):
+        """Tempo SPI estimado: bits enviados pelo clock mais o custo fixo de cada transação."""
+        return self.pixels_sent * 16 / self.spi_clock_hz * 1e6 + self.transactions * self.call_overhead_us
+
+    def stats(self):
+        """Resumo dos contadores da emulação."""
+        return {'calls': self.calls, 'pixels_sent': self.pixels_sent, 'transactions': self.transactions,
+                'spi_time_us': round(self.spi_time_us(), 1)}
+
+    def save_png(self, filepath):
+        """Salva o framebuffer como PNG (convertendo RGB565 para RGB888)."""
+        from PIL import Image
+        rgb = bytearray()
+        for p in self.framebuffer:
+            rgb += bytes((((p >> 11) & 0x1F) * 255 // 31, ((p >> 5) & 0x3F) * 255 // 63, (p & 0x1F) * 255 // 31))
+        Image.frombytes("RGB", (self.width, self.height), bytes(rgb)).save(filepath)
+
+# --- Reprodução das Saídas Geradas ---
+
+def parse_value(token, arrays):
+    """Interpreta um argumento de chamada: número, cor nomeada, booleano ou nome de array."""
+    token = token.strip()
+    if token in arrays: return arrays[token]
+    if token in TFT_COLORS: return TFT_COLORS[token]
+    if token in ("true", "false"): return token == "true"
+    return int(token, 0)
+
+def run_header(tft, code, swap=True):
+    """Executa o drawLayout de um header gerado no emulador.
+
+    'swap' reproduz o tft.setSwapBytes(true) que o sketch faz antes de chamar drawLayout;
+    chamadas setSwapBytes dentro do próprio drawLayout também são respeitadas.
+    """
+    # Remove comentários (inclui o bloco JSON da estimativa de custo).
+    code = re.sub(r"/\*.*?\*/", "", code, flags=re.S)
+    code = re.sub(r"//[^\n]*", "", code)
+
+    arrays = {}
+    for match in re.finditer(r"const\s+uint16_t\s+(\w+)\s*\[\s*(\d+)\s*\]\s*(?:PROGMEM\s*)?=\s*\{([^}]*)\}", code):
+        values = [int(v, 0) for v in match.group(3).split(",") if v.strip()]
+        if len(values) != int(match.group(2)):
+            raise ValueError(f"Array {match.group(1)}: {len(values)} valores, {match.group(2)} declarados")
+        arrays[match.group(1)] = values
+
+    body = re.search(r"void\s+drawLayout\s*\(\s*TFT_eSPI\s*&\s*(\w+)\s*\)\s*\{(.*?)\n\}", code, flags=re.S)
+    if not body:
+        raise ValueError("Função drawLayout não encontrada no header")
+    tft.setSwapBytes(swap)
+    for method, args in re.findall(rf"\b{body.group(1)}\.(\w+)\s*\((.*?)\)\s*;", body.group(2)):
+        if method not in ("pushImage", "setSwapBytes", "fillScreen", "fillRect"):
+            raise ValueError(f"Chamada não suportada pelo emulador: {method}")
+        getattr(tft, method)(*[parse_value(a, arrays) for a in args.split(",")])
+
+def read_raw_file(filepath):
+    """Lê um arquivo .RAW (pixels RGB565 little-endian) como array de uint16."""
+    pixels = array('H')
+    with open(filepath, 'rb') as f:
+        pixels.frombytes(f.read())
+    if sys.byteorder == "big":
+        pixels.byteswap()
+    return pixels
+
+def run_sd_layout(tft, json_filepath, swap=True):
+    """Reproduz um layout JSON do cartão SD: lê cada .RAW e o desenha como o sketch faria."""
+    with open(json_filepath, 'r') as f:
+        layout_data = json.load(f)
+    folder = os.path.dirname(json_filepath)
+    tft.setSwapBytes(swap)
+
+    icons = ([layout_data['background']] if layout_data.get('background') else []) + layout_data.get('icons', [])
+    for icon in icons:
+        pixels = read_raw_file(os.path.join(folder, icon['file']))
+        if len(pixels) != icon['w'] * icon['h']:
+            raise ValueError(f"{icon['file']}: {len(pixels)} pixels, esperado {icon['w'] * icon['h']}")
+        transp = TRANSPARENCY_KEY_COLOR if icon.get('transparent') else None
+        tft.pushImage(icon['x'], icon['y'], icon['w'], icon['h'], pixels, transp)
+
+# --- Referência do Canvas e Comparação ---
+
+def render_reference(elements, width, height, use_transparency):
+    """Compõe os elementos do canvas (na ordem de empilhamento) em um framebuffer RGB565.
+
+    Usa sempre o redimensionamento exato em uma passada (o que o canvas mostra), mesmo quando a
+    geração redimensiona por faixas, para que as diferenças do modo streaming apareçam na comparação.
+    """
+    reference = TFTEmulator(width, height)
+    reference.setSwapBytes(True)
+    for element in elements:
+        pil_image = load_resized_image(element['path'], element['w'], element['h'])
+        pixels = array('H', image_to_rgb565(pil_image, use_transparency))
+        transp = TRANSPARENCY_KEY_COLOR if use_transparency else None
+        reference.pushImage(element['x'], element['y'], element['w'], element['h'], pixels, transp)
+    return reference.framebuffer
+
+def streamed_elements(elements, streaming=None):
+    """Retorna os nomes dos elementos que a geração redimensiona por faixas (--stream ou origem muito grande)."""
+    from PIL import Image
+    if streaming:
+        return [element['name'] for element in elements]
+    names = []
+    for element in elements:
+        with Image.open(element['path']) as source:
+            if source.width * source.height > STREAMING_THRESHOLD_PIXELS:
+                names.append(element['name'])
+    return names
+
+def channel_delta(a, b):
+    """Maior diferença entre os canais de duas cores RGB565, em níveis de cada canal."""
+    return max(abs((a >> 11) - (b >> 11)), abs(((a >> 5) & 0x3F) - ((b >> 5) & 0x3F)), abs((a & 0x1F) - (b & 0x1F)))
+
+def diff_framebuffers(actual, expected, width, max_samples=10):
+    """Compara dois framebuffers.
+
+    Retorna o total de pixels diferentes, a maior diferença por canal e alguns exemplos (x, y, atual, esperado).
+    """
+    mismatches = 0
+    max_delta = 0
+    samples = []
+    for i, (a, e) in enumerate(zip(actual, expected)):
+        if a != e:
+            mismatches += 1
+            max_delta = max(max_delta, channel_delta(a, e))
+            if len(samples) < max_samples:
+                samples.append((i % width, i // width, a, e))
+    return mismatches, max_delta, samples
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emula na máquina host as saídas geradas pelo TFT Screen Layout Helper.")
+    parser.add_argument("--layout", help="Layout salvo pela ferramenta (referência e tamanho da tela).")
+    parser.add_argument("--header", help="Header (.h) gerado no modo Memória Interna.")
+    parser.add_argument("--sd-json", help="Layout JSON gerado no modo Micro SD (os .RAW ficam na mesma pasta).")
+    parser.add_argument("--mode", choices=("internal", "sd", "all"), default="all",
+                        help="Sem --header/--sd-json, gera as saídas do --layout neste(s) modo(s) e as reproduz.")
+    parser.add_argument("--transparency", action="store_true", help="Usa a cor chave (Color Key) na geração e na referência.")
+    parser.add_argument("--stream", action="store_true", help="Força o redimensionamento por faixas na geração (a referência é sempre exata). A origem ainda é decodificada inteira.")
+    parser.add_argument("--tolerance", type=int,
+                        help=f"Diferença máxima por canal (níveis RGB565) aceita na comparação (padrão: {STREAM_TOLERANCE_LEVELS} com redimensionamento por faixas, senão 0).")
+    parser.add_argument("--width", type=int, help="Largura da tela (padrão: a do --layout).")
+    parser.add_argument("--height", type=int, help="Altura da tela (padrão: a do --layout).")
+    parser.add_argument("--no-swap", action="store_true", help="Não chama setSwapBytes(true) antes de desenhar.")
+    parser.add_argument("--spi-clock-hz", type=int, default=DEFAULT_BUDGET_SETTINGS["spi_clock_hz"])
+    parser.add_argument("--call-overhead-us", type=float, default=DEFAULT_BUDGET_SETTINGS["call_overhead_us"])
+    parser.add_argument("--png", help="Salva o framebuffer emulado (da última saída) como PNG.")
+    args = parser.parse_args(argv)
+
+    width, height, elements = args.width, args.height, None
+    if args.layout:
+        layout_w, layout_h, elements = load_layout_file(args.layout)
+        width, height = width or layout_w, height or layout_h
+    if not width or not height:
+        parser.error("informe --layout ou --width e --height")
+
+    # Define o que será reproduzido: arquivos existentes ou saídas geradas agora a partir do layout.
+    runs = []
+    if args.header:
+        with open(args.header, 'r', encoding='utf-8') as f:
+            runs.append(("internal", lambda tft, code=f.read(): run_header(tft, code, not args.no_swap)))
+    if args.sd_json:
+        runs.append(("sd", lambda tft: run_sd_layout(tft, args.sd_json, not args.no_swap)))
+    temp_dir = None
+    if not runs:
+        if elements is None:
+            parser.error("informe --header, --sd-json ou um --layout para gerar as saídas")
+        if args.mode in ("internal", "all"):
+            code = build_internal_memory_code(elements, args.transparency, streaming=args.stream or None)
+            runs.append(("internal", lambda tft: run_header(tft, code, not args.no_swap)))
+        if args.mode in ("sd", "all"):
+            temp_dir = tempfile.TemporaryDirectory()
+            json_filepath = write_sd_card_files(elements, args.transparency, temp_dir.name, streaming=args.stream or None)
+            runs.append(("sd", lambda tft: run_sd_layout(tft, json_filepath, not args.no_swap)))
+
+    expected = streamed = None
+    if elements is not None:
+        expected = render_reference(elements, width, height, args.transparency)
+        streamed = streamed_elements(elements, args.stream)
+    tolerance = args.tolerance
+    if tolerance is None:
+        tolerance = STREAM_TOLERANCE_LEVELS if streamed else 0
+    failed = False
+    for mode, run in runs:
+        tft = TFTEmulator(width, height, args.spi_clock_hz, args.call_overhead_us)
+        run(tft)
+        report = {'mode': mode, **tft.stats()}
+        if expected is not None:
+            mismatches, max_delta, samples = diff_framebuffers(tft.framebuffer, expected, width)
+            report.update({'mismatched_pixels': mismatches, 'max_channel_delta': max_delta, 'tolerance': tolerance})
+            if streamed:
+                report['streamed_elements'] = streamed
+            if mismatches:
+                report['samples'] = [f"({x}, {y}): 0x{a:04X} != 0x{e:04X}" for x, y, a, e in samples]
+            if max_delta > tolerance:
+                failed = True
+        print(json.dumps(report, indent=4))
+        if args.png:
+            tft.save_png(args.png)
+
+    if temp_dir:
+        temp_dir.cleanup()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,504 @@
+# Conversão, exportação e estimativa de custo do TFT Screen Layout Helper, sem dependência da interface gráfica.
+# Usado pela App (main.py), pelo modo batch/watch, pelo emulador e pelos benchmarks.
+# Desenvolvido por Luiz F. R. Pimentel
+
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from array import array
+
+from PIL import Image
+
+# --- Estimativa de Custo no Dispositivo ---
+
+TRANSPARENCY_KEY_COLOR = 0xF81F  # Cor chave (Magenta) usada pela TFT_eSPI para transparência.
+PIXEL_FORMATS = {"RGB565": 16, "RGB332": 8, "RGB888": 24}  # Bits por pixel de cada formato.
+EMITTED_PIXEL_FORMAT = "RGB565"  # Formato gravado pelo gerador (arrays uint16_t e arquivos .RAW).
+
+# Valores padrão da estimativa; podem ser sobrescritos pela chave "budget" do config.json.
+DEFAULT_BUDGET_SETTINGS = {
+    "wire_bits_per_pixel": 16,  # Bits enviados por pixel no SPI (a TFT_eSPI expande RGB332 para 16 bits).
+    "spi_clock_hz": 40000000,  # Clock SPI do display.
+    "sd_clock_hz": 20000000,  # Clock SPI do cartão SD.
+    "call_overhead_us": 20,  # Custo fixo de cada transação (setWindow + início do envio).
+    "frame_budget_ms": 33,  # Tempo máximo desejado para o drawLayout (~30 FPS).
+    "flash_partition_bytes": 1310720  # Partição de app padrão do ESP32 (1.25 MB).
+}
+
+def count_color_key_runs(pixels, width, key=TRANSPARENCY_KEY_COLOR):
+    """Conta as sequências horizontais de pixels opacos e o total de pixels opacos.
+
+    Com cor chave, a TFT_eSPI envia cada sequência de pixels não transparentes de uma linha
+    como uma transação separada, então o número de sequências define o custo fixo do desenho.
+    """
+    runs = 0
+    opaque = 0
+    for row_start in range(0, len(pixels), width):
+        in_run = False
+        for p in pixels[row_start:row_start + width]:
+            if p != key:
+                opaque += 1
+                if not in_run:
+                    runs += 1
+                    in_run = True
+            else:
+                in_run = False
+    return runs, opaque
+
+def count_alpha_key_runs(pil_image):
+    """Equivalente rápido de count_color_key_runs para uma imagem PIL, a partir do canal alfa.
+
+    Pixels com alfa < 128 viram a cor chave na conversão (image_to_rgb565). A contagem é feita
+    sobre os bytes de cada linha, sem montar a lista de pixels. Pixels opacos que já têm a cor
+    chave (magenta puro) não são descontados; a exportação conta esses casos exatamente.
+    """
+    width, height = pil_image.size
+    if "A" not in pil_image.getbands():
+        return height, width * height
+    mask = pil_image.getchannel("A").point([0] * 128 + [1] * 128).tobytes()
+    runs = 0
+    for row_start in range(0, len(mask), width):
+        row = mask[row_start:row_start + width]
+        # Cada sequência opaca começa na primeira coluna ou logo após um pixel transparente.
+        runs += row.count(b"\x00\x01") + (row[0] == 1)
+    return runs, mask.count(1)
+
+def estimate_layout_budget(elements, use_transparency, storage, settings=None, key_runs=None):
+    """Estima o custo de um layout no dispositivo: flash, bytes lidos do SD e tempo do drawLayout.
+
+    'elements' segue o formato de App.elements; 'storage' é "internal" ou "sd". Se 'key_runs'
+    (nome do elemento -> (sequências, pixels opacos) de count_color_key_runs) for informado, as
+    transações com cor chave são exatas; caso contrário, cada imagem conta como uma única transação.
+    Flash e SD são contados no formato gravado (RGB565); 'bytes_by_format' só compara os demais formatos.
+    """
+    settings = {**DEFAULT_BUDGET_SETTINGS, **(settings or {})}
+    bits_per_pixel = PIXEL_FORMATS[EMITTED_PIXEL_FORMAT]
+    wire_bits_per_pixel = settings["wire_bits_per_pixel"]
+    spi_clock_hz = settings["spi_clock_hz"]
+    overhead_us = settings["call_overhead_us"]
+    
+    report_elements = []
+    total = {"flash_bytes": 0, "sd_bytes": 0, "pixels_pushed": 0, "transactions": 0, "draw_time_us": 0.0, "sd_read_time_us": 0.0}
+    for element in elements:
+        pixel_count = element['w'] * element['h']
+        image_bytes = pixel_count * bits_per_pixel // 8
+        runs = (key_runs or {}).get(element['name'])
+        if use_transparency and runs is not None:
+            transactions, pixels_pushed = max(runs[0], 1), runs[1]
+        else:
+            transactions, pixels_pushed = 1, pixel_count
+        
+        draw_time_us = pixels_pushed * wire_bits_per_pixel / spi_clock_hz * 1e6 + transactions * overhead_us
+        sd_bytes = image_bytes if storage == "sd" else 0
+        sd_read_time_us = sd_bytes * 8 / settings["sd_clock_hz"] * 1e6
+        report_elements.append({
+            'name': element['name'], 'w': element['w'], 'h': element['h'],
+            'flash_bytes': image_bytes if storage == "internal" else 0,
+            'sd_bytes': sd_bytes,
+            'bytes_by_format': {name: pixel_count * bits // 8 for name, bits in PIXEL_FORMATS.items()},
+            'pixels_pushed': pixels_pushed, 'transactions': transactions,
+            'draw_time_us': round(draw_time_us, 1), 'sd_read_time_us': round(sd_read_time_us, 1)
+        })
+        for key in total:
+            total[key] += report_elements[-1][key]
+    
+    frame_time_ms = (total["draw_time_us"] + total["sd_read_time_us"]) / 1000
+    return {
+        'pixel_format': EMITTED_PIXEL_FORMAT,
+        'storage': storage,
+        'transparency': bool(use_transparency),
+        'exact_transactions': key_runs is not None,
+        'settings': settings,
+        'elements': report_elements,
+        'total': {**total, 'draw_time_us': round(total["draw_time_us"], 1), 'sd_read_time_us': round(total["sd_read_time_us"], 1), 'frame_time_ms': round(frame_time_ms, 3)},
+        'over_frame_budget': frame_time_ms > settings["frame_budget_ms"],
+        'over_flash_partition': total["flash_bytes"] > settings["flash_partition_bytes"]
+    }
+
+def format_bytes(num_bytes):
+    """Formata uma quantidade de bytes em B, KB ou MB para exibição."""
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes / (1024 * 1024):.2f} MB"
+
+# --- Rastreamento (Tracing) da Exportação ---
+
+class _NullSpan:
+    """Span vazio usado quando o rastreamento está desligado; não mede nem guarda nada."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, num_bytes):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """Intervalo medido de um estágio da exportação (usado como context manager)."""
+    def __init__(self, tracer, name, element):
+        self.tracer = tracer
+        self.name = name
+        self.element = element
+        self.bytes = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.element, self.start, time.perf_counter(), self.bytes)
+        return False
+
+    def add_bytes(self, num_bytes):
+        self.bytes += num_bytes
+
+class ExportTracer:
+    """Registra o tempo e os bytes de cada estágio da exportação, por elemento.
+
+    Estágios: decode, resize, convert, format, write, textbox e o total (export). Desligado,
+    span() devolve sempre o mesmo objeto vazio, então o custo é uma chamada de função.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def span(self, name, element=None):
+        """Retorna um context manager que mede o estágio 'name' (opcionalmente de um elemento)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, element)
+
+    def record(self, name, element, start, end, num_bytes):
+        self.events.append({'name': name, 'element': element, 'start': start, 'end': end, 'bytes': num_bytes})
+
+    def summary(self):
+        """Soma tempo (ms) e bytes por estágio, na ordem em que os estágios apareceram."""
+        stages = {}
+        for event in self.events:
+            stage = stages.setdefault(event['name'], {'time_ms': 0.0, 'bytes': 0, 'count': 0})
+            stage['time_ms'] += (event['end'] - event['start']) * 1000
+            stage['bytes'] += event['bytes']
+            stage['count'] += 1
+        return stages
+
+    def to_chrome_trace(self):
+        """Converte os eventos para o formato Chrome Trace (chrome://tracing, Perfetto)."""
+        trace_events = []
+        for event in self.events:
+            args = {'bytes': event['bytes']}
+            if event['element']:
+                args['element'] = event['element']
+            trace_events.append({
+                'name': event['name'], 'cat': "export", 'ph': "X", 'pid': 1, 'tid': 1,
+                'ts': round((event['start'] - self.origin) * 1e6, 1),
+                'dur': round((event['end'] - event['start']) * 1e6, 1),
+                'args': args
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': "ms", 'summary': self.summary()}
+
+    def save(self, filepath):
+        """Salva o rastreamento em JSON no formato Chrome Trace."""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_chrome_trace(), f, indent=2)
+
+NULL_TRACER = ExportTracer(enabled=False)
+
+# --- Conversão e Exportação ---
+
+STREAM_BAND_ROWS = 32  # Linhas de pixels processadas por vez na conversão e na escrita.
+STREAMING_THRESHOLD_PIXELS = 16000000  # Origens maiores que isso (16 MP) são redimensionadas por faixas.
+
+class ImageProcessError(Exception):
+    """Erro ao abrir ou redimensionar a imagem de um elemento."""
+    def __init__(self, path, error):
+        super().__init__(f"{path}: {error}")
+        self.path = path
+        self.error = error
+
+def load_resized_image(image_path, new_width, new_height, tracer=NULL_TRACER, element=None):
+    """Abre uma imagem e a redimensiona para as novas dimensões. Lança ImageProcessError em caso de falha."""
+    try:
+        w, h = int(new_width), int(new_height)
+        if w <= 0 or h <= 0: raise ValueError("Dimensões devem ser positivas")
+        with tracer.span("decode", element) as span:
+            img = Image.open(image_path).convert("RGBA")
+            span.add_bytes(img.width * img.height * 4)
+        # Usa LANCZOS para um redimensionamento de alta qualidade.
+        with tracer.span("resize", element) as span:
+            img = img.resize((w, h), Image.Resampling.LANCZOS)
+            span.add_bytes(w * h * 4)
+        return img
+    except Exception as e:
+        raise ImageProcessError(image_path, e) from e
+
+def image_to_rgb565(pil_image, use_transparency):
+    """Converte os dados de uma imagem PIL para uma lista de pixels RGB565 (16 bits)."""
+    if use_transparency:
+        img_rgba = pil_image.convert("RGBA")
+        pixels_out = []
+        # Itera sobre cada pixel; se o canal alfa for baixo, usa a cor de transparência.
+        for r, g, b, a in img_rgba.getdata():
+            if a < 128: 
+                pixels_out.append(TRANSPARENCY_KEY_COLOR)
+            else:
+                # Converte RGB 888 (8 bits por canal) para RGB 565 (5 bits para R, 6 para G, 5 para B).
+                pixels_out.append(((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3))
+        return pixels_out
+    else:
+        img_rgb = pil_image.convert("RGB")
+        # Converte todos os pixels para RGB565 sem verificar a transparência.
+        return [((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3) for r, g, b in img_rgb.getdata()]
+
+def iter_rgb565_bands(image_path, new_width, new_height, use_transparency, streaming=None, band_rows=STREAM_BAND_ROWS, tracer=NULL_TRACER, element=None):
+    """Gera os pixels RGB565 da imagem redimensionada em faixas horizontais de até 'band_rows' linhas.
+
+    Normalmente a imagem é redimensionada inteira (resultado idêntico a load_resized_image) e só a
+    conversão é feita por faixas, o que já evita manter a lista completa de pixels em memória.
+    Com 'streaming' (ou, se None, quando a origem passa de STREAMING_THRESHOLD_PIXELS), cada faixa
+    também é recortada e redimensionada separadamente; veja _iter_resized_bands.
+    """
+    try:
+        w, h = int(new_width), int(new_height)
+        if w <= 0 or h <= 0: raise ValueError("Dimensões devem ser positivas")
+        with Image.open(image_path) as source:
+            source_pixels = source.width * source.height
+    except Exception as e:
+        raise ImageProcessError(image_path, e) from e
+    
+    if streaming is None:
+        streaming = source_pixels > STREAMING_THRESHOLD_PIXELS
+    if streaming:
+        bands = _iter_resized_bands(image_path, w, h, band_rows, tracer, element)
+    else:
+        pil_image = load_resized_image(image_path, w, h, tracer, element)
+        bands = (pil_image.crop((0, y0, w, min(y0 + band_rows, h))) for y0 in range(0, h, band_rows))
+    
+    for band in bands:
+        with tracer.span("convert", element) as span:
+            pixels = image_to_rgb565(band, use_transparency)
+            span.add_bytes(len(pixels) * 2)
+        yield pixels
+
+def _iter_resized_bands(image_path, w, h, band_rows, tracer, element):
+    """Redimensiona a imagem faixa por faixa, guardando em RGBA só a faixa atual.
+
+    A origem ainda é decodificada inteira, uma única vez e no modo nativo (sem a cópia RGBA completa),
+    então o pico de memória acompanha o tamanho da origem, não o da faixa. Cada faixa de saída usa só
+    as linhas de origem ao seu alcance (mais a margem do filtro LANCZOS). O resultado não é idêntico
+    ao de load_resized_image: os coeficientes do filtro são calculados em relação ao recorte de cada
+    faixa, e o arredondamento em ponto fixo muda 1 nível RGB565 em pixels esparsos (em qualquer linha,
+    não só nas bordas das faixas). Um alfa exatamente no limite da cor chave (127/128) pode mudar de lado.
+    """
+    try:
+        with Image.open(image_path) as source:
+            with tracer.span("decode", element) as span:
+                source.load()
+                span.add_bytes(len(source.getbands()) * source.width * source.height)
+            sw, sh = source.size
+            scale = sh / h
+            support = 3 * max(scale, 1) # Alcance do filtro LANCZOS (a = 3) em linhas da origem.
+            
+            for y0 in range(0, h, band_rows):
+                y1 = min(y0 + band_rows, h)
+                with tracer.span("resize", element) as span:
+                    top = max(0, math.floor(y0 * scale - support) - 1)
+                    bottom = min(sh, math.ceil(y1 * scale + support) + 1)
+                    part = source.crop((0, top, sw, bottom)).convert("RGBA")
+                    band = part.resize((w, y1 - y0), Image.Resampling.LANCZOS, box=(0, y0 * scale - top, sw, y1 * scale - top))
+                    span.add_bytes(w * (y1 - y0) * 4)
+                yield band
+    except Exception as e:
+        raise ImageProcessError(image_path, e) from e
+
+def get_c_identifier(element_name):
+    """Gera o nome da variável C++ usada para o array de um elemento."""
+    return element_name.replace('.', '_').replace('-', '_')
+
+def get_raw_filename(element_name):
+    """Gera um nome de arquivo .RAW compatível com sistemas de arquivos mais antigos (8.3)."""
+    base_name = element_name.split('_')[-1].split('.')[0][:8]
+    return f"{base_name}.RAW"
+
+def write_c_array(sink, var_name, bands, total_pixels, width, use_transparency, tracer=NULL_TRACER, element=None):
+    """Escreve em 'sink' a declaração do array uint16_t de um elemento, faixa por faixa.
+
+    Retorna (sequências, pixels opacos) da cor chave, para a estimativa de custo.
+    """
+    sink.write(f"const uint16_t {var_name}_data[{total_pixels}] = {{\n  ")
+    index = 0
+    runs = opaque = 0
+    for pixels in bands:
+        if use_transparency:
+            band_runs, band_opaque = count_color_key_runs(pixels, width)
+            runs, opaque = runs + band_runs, opaque + band_opaque
+        with tracer.span("format", element) as span:
+            pixel_parts = []
+            for p in pixels:
+                index += 1
+                pixel_parts.append(f"0x{p:04X}, ")
+                # Adiciona uma quebra de linha a cada 16 pixels para melhor formatação.
+                if index % 16 == 0 and index < total_pixels:
+                    pixel_parts.append("\n  ")
+            text = "".join(pixel_parts)
+            sink.write(text)
+            span.add_bytes(len(text))
+    sink.write("\n};\n\n")
+    return runs, opaque
+
+def write_rgb565_raw(sink, bands, width, use_transparency, tracer=NULL_TRACER, element=None):
+    """Escreve os pixels em 'sink' como 'unsigned short' little-endian, faixa por faixa.
+
+    Retorna (sequências, pixels opacos) da cor chave, para a estimativa de custo.
+    """
+    runs = opaque = 0
+    for pixels in bands:
+        if use_transparency:
+            band_runs, band_opaque = count_color_key_runs(pixels, width)
+            runs, opaque = runs + band_runs, opaque + band_opaque
+        with tracer.span("write", element) as span:
+            data = array('H', pixels)
+            if sys.byteorder == "big":
+                data.byteswap()
+            sink.write(data.tobytes())
+            span.add_bytes(len(data) * 2)
+    return runs, opaque
+
+def render_c_array(element, use_transparency, tracer=NULL_TRACER, streaming=None):
+    """Gera o texto do array de um elemento. Retorna (texto, (sequências, pixels opacos))."""
+    sink = io.StringIO()
+    bands = iter_rgb565_bands(element['path'], element['w'], element['h'], use_transparency, streaming, tracer=tracer, element=element['name'])
+    runs = write_c_array(sink, get_c_identifier(element['name']), bands, element['w'] * element['h'], element['w'], use_transparency, tracer, element['name'])
+    return sink.getvalue(), runs
+
+def write_internal_memory_code(sink, elements, use_transparency, budget_settings=None, tracer=NULL_TRACER, streaming=None, cached_arrays=None):
+    """Escreve em 'sink' um header C++ (.h) com os dados das imagens em arrays uint16_t.
+
+    'cached_arrays' (nome do elemento -> resultado de render_c_array) permite reaproveitar arrays
+    já gerados; só os elementos ausentes dele são convertidos novamente.
+    """
+    TRANSPARENCY_COLOR_HEX = f"0x{TRANSPARENCY_KEY_COLOR:04X}"
+    elements = list(elements)
+    sink.write("// This code was generated by TFT Screen Layout Helper by Luiz F. R. Pimentel\n// Mode: Internal Memory\n")
+    if use_transparency:
+        sink.write(f"// Transparency activated with Color Key: {TRANSPARENCY_COLOR_HEX} (Magenta)\n")
+    sink.write("\n#pragma once\n\n#include <TFT_eSPI.h>\n\n")
+    
+    draw_function_parts = ["void drawLayout(TFT_eSPI& tft) {\n"]
+    key_runs = {}
+    for element in elements:
+        name = element['name']
+        img_var_name = get_c_identifier(name)
+        if cached_arrays and name in cached_arrays:
+            text, key_runs[name] = cached_arrays[name]
+            sink.write(text)
+        else:
+            bands = iter_rgb565_bands(element['path'], element['w'], element['h'], use_transparency, streaming, tracer=tracer, element=name)
+            key_runs[name] = write_c_array(sink, img_var_name, bands, element['w'] * element['h'], element['w'], use_transparency, tracer, name)
+        
+        # Cria a chamada de função para desenhar a imagem.
+        draw_call = f"  tft.pushImage({element['x']}, {element['y']}, {element['w']}, {element['h']}, {img_var_name}_data"
+        if use_transparency:
+            draw_call += f", {TRANSPARENCY_COLOR_HEX}"
+        draw_call += ");\n"
+        draw_function_parts.append(draw_call)
+        
+    draw_function_parts.append("}\n")
+    sink.write("".join(draw_function_parts))
+    
+    # A estimativa de custo só fica pronta depois de todos os pixels, por isso vai ao final do header.
+    budget = estimate_layout_budget(elements, use_transparency, "internal", budget_settings, key_runs)
+    sink.write(f"\n/* Budget estimate (JSON):\n{json.dumps(budget, indent=2)}\n*/\n")
+
+def build_internal_memory_code(elements, use_transparency, budget_settings=None, tracer=NULL_TRACER, streaming=None):
+    """Gera o texto de um header C++ (.h) com os dados das imagens em arrays uint16_t."""
+    sink = io.StringIO()
+    write_internal_memory_code(sink, elements, use_transparency, budget_settings, tracer, streaming)
+    return sink.getvalue()
+
+@contextlib.contextmanager
+def atomic_open(filepath, mode='w', **kwargs):
+    """Abre um arquivo temporário e, ao final, o move sobre 'filepath' de uma só vez (os.replace).
+
+    Quem lê a saída (o sketch, o compilador, um watcher) nunca vê um arquivo pela metade.
+    """
+    temp_filepath = filepath + ".tmp"
+    try:
+        with open(temp_filepath, mode, **kwargs) as f:
+            yield f
+        os.replace(temp_filepath, filepath)
+    except BaseException:
+        if os.path.exists(temp_filepath):
+            os.remove(temp_filepath)
+        raise
+
+def write_raw_file(element, use_transparency, output_folder, tracer=NULL_TRACER, streaming=None):
+    """Grava o arquivo .RAW de um elemento. Retorna (sequências, pixels opacos) da cor chave."""
+    name = element['name']
+    output_filepath = os.path.join(output_folder, get_raw_filename(name))
+    bands = iter_rgb565_bands(element['path'], element['w'], element['h'], use_transparency, streaming, tracer=tracer, element=name)
+    with atomic_open(output_filepath, 'wb') as f:
+        return write_rgb565_raw(f, bands, element['w'], use_transparency, tracer, name)
+
+def write_sd_layout_json(elements, use_transparency, output_folder, budget_settings=None, key_runs=None, tracer=NULL_TRACER):
+    """Grava o JSON de layout (posições dos .RAW) e a estimativa de custo. Retorna o caminho do layout."""
+    elements = list(elements)
+    if not elements:
+        # O nome do JSON vem do último elemento; sem elementos não há layout para gravar.
+        raise ValueError("O layout não tem elementos para gerar")
+    layout_data = {
+        'author': "Luiz F. R. Pimentel",
+        'github': "https://github.com/KanekiZLF",
+        'background': None, 
+        'icons': []
+    }
+    for i, element in enumerate(elements):
+        output_filename = get_raw_filename(element['name'])
+        icon_data = {'file': output_filename, 'x': element['x'], 'y': element['y'], 'w': element['w'], 'h': element['h']}
+        if use_transparency:
+            icon_data['transparent'] = True
+        
+        # O primeiro elemento é considerado o fundo.
+        if i == 0:
+            layout_data['background'] = icon_data
+        else:
+            layout_data['icons'].append(icon_data)
+            
+    base_name = output_filename[:-len(".RAW")]
+    json_filepath = os.path.join(output_folder, f"Layout_{base_name}.JSON")
+    with tracer.span("write"):
+        with atomic_open(json_filepath, 'w') as f:
+            json.dump(layout_data, f, indent=4)
+    
+    # Salva a estimativa de custo do layout junto com os arquivos gerados.
+    budget = estimate_layout_budget(elements, use_transparency, "sd", budget_settings, key_runs)
+    with atomic_open(os.path.join(output_folder, "Budget.JSON"), 'w') as f:
+        json.dump(budget, f, indent=4)
+    return json_filepath
+
+def write_sd_card_files(elements, use_transparency, output_folder, budget_settings=None, tracer=NULL_TRACER, streaming=None):
+    """Grava um arquivo binário (.RAW) por imagem, o JSON de layout e a estimativa de custo.
+
+    Retorna o caminho do JSON de layout. Lança ImageProcessError ou OSError em caso de falha.
+    """
+    elements = list(elements)
+    key_runs = {}
+    for element in elements:
+        key_runs[element['name']] = write_raw_file(element, use_transparency, output_folder, tracer, streaming)
+    return write_sd_layout_json(elements, use_transparency, output_folder, budget_settings, key_runs, tracer)
+
+def load_layout_file(filepath):
+    """Lê um layout salvo pela App (Save Layout) e retorna (largura, altura, elementos)."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        layout_data = json.load(f)
+    canvas_size = layout_data.get('canvas_size', {'width': 320, 'height': 240})
+    return int(canvas_size['width']), int(canvas_size['height']), layout_data.get('elements', [])
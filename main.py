@@ -1,14 +1,46 @@
 # Ferramenta gráfica para auxiliar na criação de layouts de tela para microcontroladores (ESP32) com displays TFT.
 # Desenvolvido por Luiz F. R. Pimentel
 
+import time
+STARTUP_T0 = time.perf_counter()  # Início da carga do módulo, usado pelo --profile-startup.
+
 import tkinter
 from tkinter import messagebox, filedialog
 import customtkinter as ctk
 from PIL import Image, ImageTk
+from collections import OrderedDict
+import argparse
+import contextlib
+import math
 import os
-import struct
+import sys
 import json
-import webbrowser
+
+from export import (DEFAULT_BUDGET_SETTINGS, NULL_TRACER, ExportTracer, ImageProcessError, atomic_open,
+                    build_internal_memory_code, count_alpha_key_runs, estimate_layout_budget, format_bytes,
+                    get_raw_filename, image_to_rgb565, load_layout_file, load_resized_image, render_c_array,
+                    write_internal_memory_code, write_raw_file, write_sd_card_files, write_sd_layout_json)
+# ImageDraw, webbrowser e hashlib são importados só quando usados (grid, janela Sobre e modo watch),
+# para não pesar na abertura da janela.
+
+STARTUP_TARGET_MS = 300  # Meta de tempo até o primeiro quadro da janela.
+
+# --- Constantes de Renderização do Canvas ---
+
+ZOOM_LEVELS = (0.25, 0.5, 1, 2, 3, 4, 6, 8)  # Níveis de zoom disponíveis para o canvas.
+ZOOM_CACHE_MAX_PIXELS = 16000000  # Total de pixels das variantes de imagem (elemento, zoom, recorte) em cache.
+ZOOM_CROP_MARGIN = 0.5  # Com zoom > 1, cada elemento é recortado à vista mais essa fração dela em cada lado.
+GRID_CACHE_SIZE = 8  # Máximo de imagens de fundo do grid mantidas em cache.
+GRID_MIN_STEP_PX = 5  # Espaçamento mínimo (em pixels de tela) entre as linhas do grid.
+CANVAS_BG_COLOR = "#1E1E1E"  # Cor da área fora do display.
+DISPLAY_BG_COLOR = "#2B2B2B"  # Cor de fundo do display.
+
+# --- Constantes de Interação ---
+
+DRAG_FRAME_MS = 16  # Intervalo mínimo entre atualizações do canvas durante o arraste (~60 FPS).
+READOUT_INTERVAL_MS = 100  # Intervalo mínimo entre atualizações da leitura de coordenadas.
+NUDGE_STEP = 1  # Deslocamento (em pixels do display) de cada seta do teclado.
+NUDGE_STEP_FAST = 10  # Deslocamento com Shift pressionado.
 
 # --- Funções de Configuração ---
 
@@ -68,7 +100,10 @@ TRANSLATIONS = {
         "qr_code_not_found": "QR Code image (pix_qrcode.png)\nnot found in the project folder.",
         "find_me_on_github": "Find me on GitHub (click to open):",
         "how_to_use_section_title": "How to Use",
-        "how_to_use_link_text": "Click here to watch the tutorial video on YouTube"
+        "how_to_use_link_text": "Click here to watch the tutorial video on YouTube",
+        "zoom_fit": "Fit",
+        "budget_summary": "Flash: {flash} | SD: {sd}\nDraw: ~{draw:.1f} ms of {budget} ms @ {spi:g} MHz",
+        "trace_summary": "Last export: {total:.0f} ms\n{stages}"
     },
     "pt": {
         "window_title": "TFT Screen Layout Helper", "general_settings": "Configurações Gerais",
@@ -109,46 +144,29 @@ TRANSLATIONS = {
         "qr_code_not_found": "Imagem do QR Code (pix_qrcode.png)\nnão encontrada na pasta do projeto.",
         "find_me_on_github": "Me encontre no GitHub (clique para abrir):",
         "how_to_use_section_title": "Como Usar",
-        "how_to_use_link_text": "Clique aqui para assistir ao vídeo tutorial no YouTube"
+        "how_to_use_link_text": "Clique aqui para assistir ao vídeo tutorial no YouTube",
+        "zoom_fit": "Ajustar",
+        "budget_summary": "Flash: {flash} | SD: {sd}\nDesenho: ~{draw:.1f} ms de {budget} ms @ {spi:g} MHz",
+        "trace_summary": "Última exportação: {total:.0f} ms\n{stages}"
     }
 }
 
 # --- Classe Principal da Aplicação ---
 class App(ctk.CTk):
     def resize_image(self, image_path, new_width, new_height):
-        """Redimensiona uma imagem a partir de seu caminho para as novas dimensões."""
+        """Redimensiona uma imagem a partir de seu caminho, exibindo uma mensagem em caso de erro."""
         try:
-            w, h = int(new_width), int(new_height)
-            if w <= 0 or h <= 0: raise ValueError("Dimensões devem ser positivas")
-            img = Image.open(image_path).convert("RGBA")
-            # Usa LANCZOS para um redimensionamento de alta qualidade.
-            return img.resize((w, h), Image.Resampling.LANCZOS)
-        except Exception as e:
-            messagebox.showerror(self.get_string("title_error"), self.get_string("error_image_process").format(path=image_path, e=e))
+            return load_resized_image(image_path, new_width, new_height)
+        except ImageProcessError as e:
+            messagebox.showerror(self.get_string("title_error"), self.get_string("error_image_process").format(path=e.path, e=e.error))
             return None
 
     def convert_image_data(self, pil_image, use_transparency):
         """Converte os dados de uma imagem PIL para o formato de cor RGB565 (16 bits)."""
-        # Cor chave para transparência (Magenta), usada pela biblioteca TFT_eSPI.
-        TRANSPARENCY_KEY_COLOR = 0xF81F
-        
-        if use_transparency:
-            img_rgba = pil_image.convert("RGBA")
-            pixels_out = []
-            # Itera sobre cada pixel; se o canal alfa for baixo, usa a cor de transparência.
-            for r, g, b, a in img_rgba.getdata():
-                if a < 128: 
-                    pixels_out.append(TRANSPARENCY_KEY_COLOR)
-                else:
-                    # Converte RGB 888 (8 bits por canal) para RGB 565 (5 bits para R, 6 para G, 5 para B).
-                    pixels_out.append(((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3))
-            return pixels_out
-        else:
-            img_rgb = pil_image.convert("RGB")
-            # Converte todos os pixels para RGB565 sem verificar a transparência.
-            return [((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3) for r, g, b in img_rgb.getdata()]
+        return image_to_rgb565(pil_image, use_transparency)
             
-    def __init__(self):
+    def __init__(self, profile_startup=False):
+        init_start = time.perf_counter()
         super().__init__()
         
         # Carrega a configuração de idioma.
@@ -176,7 +194,19 @@ class App(ctk.CTk):
         # Dicionários para gerenciar os elementos na tela.
         self.elements = {}  # Guarda dados (path, x, y, w, h) dos elementos.
         self.element_counter = 0  # Contador para gerar nomes únicos para cada imagem.
-        self.tk_images = {}  # Mantém as referências das imagens para o Tkinter não as descartar.
+        self.tk_images = {}  # Mantém as referências das imagens exibidas para o Tkinter não as descartar.
+        self.pil_images = {}  # Imagem base (no tamanho do elemento) de cada item do canvas.
+        self._key_runs_cache = {}  # (caminho, largura, altura) -> (sequências, pixels opacos) da cor chave.
+        
+        # Estado de zoom e caches de renderização.
+        self.zoom = 1
+        self._zoom_cache = OrderedDict()  # (canvas_id, zoom, recorte) -> PhotoImage já escalada.
+        self._zoom_cache_pixels = 0  # Soma dos pixels das variantes em cache.
+        self._crops = {}  # canvas_id -> recorte (em pixels do elemento) exibido com zoom > 1, ou None.
+        self._grid_cache = OrderedDict()  # (passo, largura, altura) -> PhotoImage do grid.
+        self._grid_item = None  # Item do canvas que exibe o fundo do grid.
+        self._grid_state = None  # Última posição/tamanho do grid, evita reconfigurações inúteis.
+        self._fit_pending = True  # Ajusta o zoom assim que o canvas tiver tamanho real.
         
         # Configura o layout de grid da janela principal.
         self.grid_rowconfigure(0, weight=1)
@@ -188,8 +218,32 @@ class App(ctk.CTk):
         self.left_frame.grid_rowconfigure(0, weight=1)
         self.left_frame.grid_columnconfigure(0, weight=1)
         
-        self.canvas = tkinter.Canvas(self.left_frame, bg="#2B2B2B", highlightthickness=0)
-        self.canvas.grid(row=0, column=0)
+        self.canvas = tkinter.Canvas(self.left_frame, bg=CANVAS_BG_COLOR, highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        
+        # Barra de zoom abaixo do canvas.
+        zoom_frame = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        zoom_frame.grid(row=1, column=0, pady=(5, 0))
+        self.zoom_out_button = ctk.CTkButton(zoom_frame, text="-", width=30, command=lambda: self.step_zoom(-1))
+        self.zoom_out_button.pack(side="left")
+        self.zoom_label = ctk.CTkLabel(zoom_frame, text="100%", width=60)
+        self.zoom_label.pack(side="left", padx=5)
+        self.zoom_in_button = ctk.CTkButton(zoom_frame, text="+", width=30, command=lambda: self.step_zoom(1))
+        self.zoom_in_button.pack(side="left")
+        self.zoom_fit_button = ctk.CTkButton(zoom_frame, text=self.get_string("zoom_fit"), width=60, command=self.zoom_to_fit)
+        self.zoom_fit_button.pack(side="left", padx=(10, 0))
+        self.position_label = ctk.CTkLabel(zoom_frame, text="", width=110)
+        self.position_label.pack(side="left", padx=(10, 0))
+        
+        # Navegação: botão do meio arrasta a vista, roda do mouse rola e Ctrl+roda aplica zoom.
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+        self.canvas.bind("<ButtonPress-2>", self.on_pan_start)
+        self.canvas.bind("<B2-Motion>", self.on_pan_move)
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Control-MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_mouse_wheel)
+        for button in ("<Button-4>", "<Button-5>", "<Control-Button-4>", "<Control-Button-5>", "<Shift-Button-4>", "<Shift-Button-5>"):
+            self.canvas.bind(button, self.on_mouse_wheel) # Linux (X11) usa os botões 4 e 5 para a roda.
         
         # Frame da direita, para os painéis de controle.
         self.right_frame = ctk.CTkFrame(self, width=300)
@@ -200,6 +254,25 @@ class App(ctk.CTk):
         self.canvas.tag_bind("draggable", "<B1-Motion>", self.on_drag)
         self.canvas.tag_bind("draggable", "<ButtonRelease-1>", self.on_release)
         self._drag_data = {"x": 0, "y": 0, "item": None} # Dicionário para guardar o estado do arraste.
+        
+        # Estado para agrupar eventos de movimento em uma atualização por quadro.
+        self._pending_drag = None  # Última posição do mouse ainda não aplicada ao canvas.
+        self._drag_after_id = None  # Callback agendado para aplicar o arraste pendente.
+        self._last_drag_flush = 0.0  # Momento (perf_counter) da última atualização do arraste.
+        self._readout_after_id = None  # Callback agendado para atualizar a leitura de coordenadas.
+        self._pending_nudge = [0, 0]  # Deslocamento acumulado pelas setas do teclado.
+        self._nudge_after_id = None
+        
+        # Overlay de depuração (F3) com o tempo de quadro medido durante o arraste.
+        self._debug_overlay = None
+        self._frame_times = []  # Intervalos entre quadros recentes (ms).
+        self._frame_work_times = []  # Tempo gasto em cada atualização (ms).
+        
+        # Setas movem o elemento selecionado; Shift+seta move mais rápido.
+        for key, (dx, dy) in {"Left": (-1, 0), "Right": (1, 0), "Up": (0, -1), "Down": (0, 1)}.items():
+            self.bind(f"<KeyPress-{key}>", lambda e, dx=dx, dy=dy: self.on_nudge(e, dx, dy, NUDGE_STEP))
+            self.bind(f"<Shift-KeyPress-{key}>", lambda e, dx=dx, dy=dy: self.on_nudge(e, dx, dy, NUDGE_STEP_FAST))
+        self.bind("<F3>", self.toggle_debug_overlay)
 
         # --- Widgets do Painel de Controle ---
         self.controls_frame = ctk.CTkFrame(self.right_frame)
@@ -236,14 +309,64 @@ class App(ctk.CTk):
         self.output_type_label = ctk.CTkLabel(self.controls_frame, text=self.get_string("output_memory_type"))
         self.output_type_label.pack(padx=10, pady=(10,0))
         self.storage_type_var = ctk.StringVar(value=self.get_string("internal_memory"))
-        self.storage_type_menu = ctk.CTkOptionMenu(self.controls_frame, variable=self.storage_type_var, values=[self.get_string("internal_memory"), self.get_string("microsd")])
+        self.storage_type_menu = ctk.CTkOptionMenu(self.controls_frame, variable=self.storage_type_var, values=[self.get_string("internal_memory"), self.get_string("microsd")], command=lambda _: self.update_budget_display())
         self.storage_type_menu.pack(padx=10, pady=5)
         self.transparency_var = ctk.BooleanVar()
-        self.transparency_checkbox = ctk.CTkCheckBox(self.controls_frame, text=self.get_string("use_transparency"), onvalue=True, offvalue=False, variable=self.transparency_var)
+        self.transparency_checkbox = ctk.CTkCheckBox(self.controls_frame, text=self.get_string("use_transparency"), onvalue=True, offvalue=False, variable=self.transparency_var, command=self.update_budget_display)
         self.transparency_checkbox.pack(padx=10, pady=10)
         self.generate_button = ctk.CTkButton(self.controls_frame, text=self.get_string("generate_button"), command=self.generate_output, fg_color="green", hover_color="darkgreen")
         self.generate_button.pack(pady=10, padx=10, fill="x")
         
+        # Estimativa ao vivo do custo do layout no dispositivo.
+        self.budget_label = ctk.CTkLabel(self.controls_frame, text="", justify="left", font=ctk.CTkFont(size=11))
+        self.budget_label.pack(padx=10, pady=(0, 5))
+        
+        # Resumo do rastreamento da última exportação (só aparece com "trace_export" no config.json).
+        self.trace_label = ctk.CTkLabel(self.controls_frame, text="", justify="left", font=ctk.CTkFont(size=11), text_color="gray")
+        self.trace_label.pack(padx=10)
+        
+        self._qr_image = None  # CTkImage do QR code, criada na primeira abertura da janela 'Sobre'.
+        
+        # O painel de elementos e o grid só são montados depois do primeiro quadro (finish_startup),
+        # para a janela aparecer o quanto antes.
+        self.elements_frame = None
+        self._startup_profile = {'init_start': init_start} if profile_startup else None
+        self.bind("<Map>", self.on_first_map, add="+")
+        self.update_budget_display()
+        if profile_startup:
+            self._startup_profile['init_end'] = time.perf_counter()
+
+    def on_first_map(self, event):
+        """Agenda o restante da inicialização para logo após a janela ser exibida pela primeira vez."""
+        if event.widget is not self or self.elements_frame is not None: return
+        self.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        """Monta o que foi adiado na inicialização: o painel de elementos, o zoom inicial e o grid."""
+        if self.elements_frame is not None: return
+        first_frame = time.perf_counter()
+        
+        self.build_elements_panel()
+        self.update_idletasks() # Garante o tamanho final do canvas antes de ajustar o zoom.
+        self.zoom_to_fit()
+        
+        if self._startup_profile is not None:
+            self._startup_profile.update({'first_frame': first_frame, 'deferred_end': time.perf_counter()})
+            self.report_startup_profile()
+
+    def report_startup_profile(self):
+        """Mostra os tempos de abertura (--profile-startup) e fecha a aplicação."""
+        profile = self._startup_profile
+        time_to_first_frame = (profile['first_frame'] - STARTUP_T0) * 1000
+        print("Startup profile:")
+        print(f"  module imports:      {(profile['init_start'] - STARTUP_T0) * 1000:8.1f} ms")
+        print(f"  App.__init__:        {(profile['init_end'] - profile['init_start']) * 1000:8.1f} ms")
+        print(f"  time to first frame: {time_to_first_frame:8.1f} ms (target {STARTUP_TARGET_MS} ms: {'OK' if time_to_first_frame <= STARTUP_TARGET_MS else 'OVER'})")
+        print(f"  deferred setup:      {(profile['deferred_end'] - profile['first_frame']) * 1000:8.1f} ms")
+        self.after_idle(self.destroy)
+
+    def build_elements_panel(self):
+        """Cria o painel de gerenciamento de elementos (importar, lista, redimensionar, excluir, salvar/carregar)."""
         # Frame para gerenciamento de elementos (imagens).
         self.elements_frame = ctk.CTkFrame(self.right_frame)
         self.elements_frame.pack(pady=10, padx=10, fill="x")
@@ -288,14 +411,45 @@ class App(ctk.CTk):
         self.save_layout_button.grid(row=0, column=0, padx=(0,5), sticky="ew")
         self.load_layout_button = ctk.CTkButton(self.save_load_frame, text=self.get_string("load_layout_button"), command=self.load_layout)
         self.load_layout_button.grid(row=0, column=1, padx=(5,0), sticky="ew")
-        
-        # Inicializa o tamanho do canvas e desenha o grid.
-        self.update_canvas_size()
 
     def get_string(self, key):
         """Obtém uma string de texto do dicionário de traduções com base no idioma atual."""
         return TRANSLATIONS[self.current_language].get(key, key)
 
+    def get_budget_settings(self):
+        """Retorna os parâmetros da estimativa de custo (padrões + chave "budget" do config.json)."""
+        return {**DEFAULT_BUDGET_SETTINGS, **self.config.get("budget", {})}
+
+    def get_storage_key(self):
+        """Retorna "internal" ou "sd" conforme o tipo de memória de saída selecionado."""
+        return "internal" if self.storage_type_var.get() == self.get_string("internal_memory") else "sd"
+
+    def update_budget_display(self):
+        """Recalcula a estimativa de custo do layout e a exibe no painel lateral."""
+        settings = self.get_budget_settings()
+        key_runs = self.get_key_runs() if self.transparency_var.get() else None
+        budget = estimate_layout_budget(self.elements.values(), self.transparency_var.get(), self.get_storage_key(), settings, key_runs)
+        total = budget['total']
+        self.budget_label.configure(
+            text=self.get_string("budget_summary").format(
+                flash=format_bytes(total['flash_bytes']), sd=format_bytes(total['sd_bytes']),
+                draw=total['frame_time_ms'], budget=settings['frame_budget_ms'], spi=settings['spi_clock_hz'] / 1e6),
+            # Destaca em vermelho layouts que estouram o tempo de quadro ou a partição de flash.
+            text_color="#E74C3C" if budget['over_frame_budget'] or budget['over_flash_partition'] else ("gray10", "gray90"))
+
+    def get_key_runs(self):
+        """Retorna nome do elemento -> (sequências, pixels opacos) da cor chave, para a estimativa com transparência.
+
+        Cada imagem é contada só na primeira vez que aparece com um dado caminho e tamanho.
+        """
+        key_runs = {}
+        for canvas_id, element in self.elements.items():
+            key = (element['path'], element['w'], element['h'])
+            if key not in self._key_runs_cache:
+                self._key_runs_cache[key] = count_alpha_key_runs(self.pil_images[canvas_id])
+            key_runs[element['name']] = self._key_runs_cache[key]
+        return key_runs
+
     def toggle_language(self):
         """Alterna o idioma entre inglês e português e atualiza a UI."""
         self.current_language = "pt" if self.current_language == "en" else "en"
@@ -317,12 +471,16 @@ class App(ctk.CTk):
             self.storage_type_var.set(storage_values[0])
         self.transparency_checkbox.configure(text=self.get_string("use_transparency"))
         self.generate_button.configure(text=self.get_string("generate_button"))
+        self.language_button.configure(text=self.get_string("language_button"))
+        self.about_button.configure(text=self.get_string("about_button"))
+        self.zoom_fit_button.configure(text=self.get_string("zoom_fit"))
+        self.update_budget_display()
+        if self.elements_frame is None: return # O painel de elementos já nasce com os textos do idioma atual.
+        
         self.import_button.configure(text=self.get_string("import_image_button"))
         self.resize_button.configure(text=self.get_string("apply_resize"))
         self.delete_button.configure(text=self.get_string("delete_selected"))
         self.clear_all_button.configure(text=self.get_string("clear_all_button"))
-        self.language_button.configure(text=self.get_string("language_button"))
-        self.about_button.configure(text=self.get_string("about_button"))
         self.save_layout_button.configure(text=self.get_string("save_layout_button"))
         self.load_layout_button.configure(text=self.get_string("load_layout_button"))
         self.element_w_label.configure(text=self.get_string("element_w"))
@@ -330,6 +488,8 @@ class App(ctk.CTk):
 
     def show_about_window(self):
         """Cria e exibe a janela 'Sobre' com informações, links e QR code para doação."""
+        import webbrowser
+        
         QR_CODE_IMAGE_PATH = "assets/qrcode_pix.png"
         TUTORIAL_LINK = "https://www.youtube.com/watch?v=dQw4w9WgXcQ" 
 
@@ -395,9 +555,11 @@ class App(ctk.CTk):
         donation_message2_label = ctk.CTkLabel(donation_frame, text=self.get_string("donation_message_2"), font=ctk.CTkFont(weight="bold"))
         donation_message2_label.pack(padx=10, pady=10)
         try:
-            pil_image = Image.open(QR_CODE_IMAGE_PATH)
-            qr_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(150, 150))
-            qr_label = ctk.CTkLabel(donation_frame, image=qr_image, text="")
+            # O QR code é decodificado só na primeira abertura e reaproveitado nas seguintes.
+            if self._qr_image is None:
+                pil_image = Image.open(QR_CODE_IMAGE_PATH)
+                self._qr_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(150, 150))
+            qr_label = ctk.CTkLabel(donation_frame, image=self._qr_image, text="")
             qr_label.pack(padx=10, pady=10)
         except FileNotFoundError:
             qr_label = ctk.CTkLabel(donation_frame, text=self.get_string("qr_code_not_found"), text_color="red", font=ctk.CTkFont(size=14))
@@ -418,31 +580,288 @@ class App(ctk.CTk):
         link_label.bind("<Button-1>", lambda e: webbrowser.open(github_link))
 
     def update_canvas_size(self):
-        """Atualiza as dimensões do canvas com base nos valores dos campos de entrada."""
+        """Atualiza as dimensões do display com base nos valores dos campos de entrada."""
         try:
-            new_width = int(self.width_entry.get())
-            new_height = int(self.height_entry.get())
-            self.canvas.config(width=new_width, height=new_height)
-            self.focus_set() # Tira o foco dos campos de entrada.
-            self.draw_grid() # Redesenha o grid para o novo tamanho.
+            int(self.width_entry.get())
+            int(self.height_entry.get())
         except ValueError:
             messagebox.showerror(self.get_string("title_error"), self.get_string("error_value_must_be_int"))
-    
-    def draw_grid(self, spacing=10, color="#555555"):
-        """Desenha um grid pontilhado no fundo do canvas para auxiliar no alinhamento."""
-        self.canvas.delete("grid_line") # Deleta qualquer grid antigo.
-        
+            return
+        self.focus_set() # Tira o foco dos campos de entrada.
+        self._fit_pending = True
+        if self.canvas.winfo_width() > 1:
+            self.zoom_to_fit()
+        else:
+            # O canvas ainda não foi exibido; o ajuste acontece no primeiro <Configure>.
+            self.update_scrollregion()
+            self.draw_grid()
+
+    def get_display_size(self):
+        """Retorna a largura e a altura do display informadas nos campos de entrada."""
         try:
-            width = int(self.width_entry.get())
-            height = int(self.height_entry.get())
+            return int(self.width_entry.get()), int(self.height_entry.get())
         except ValueError:
-            return # Se os valores não forem números, não desenha o grid.
+            return None
+
+    # --- Renderização do Canvas (zoom, pan e caches) ---
 
-        # Desenha as linhas verticais e horizontais.
-        for x in range(0, width, spacing):
-            self.canvas.create_line(x, 0, x, height, fill=color, tags="grid_line")
-        for y in range(0, height, spacing):
-            self.canvas.create_line(0, y, width, y, fill=color, tags="grid_line")
+    def set_zoom(self, zoom):
+        """Aplica um novo nível de zoom, mantendo o centro da vista no mesmo ponto do display."""
+        view_w, view_h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        center_x = self.canvas.canvasx(view_w / 2) / self.zoom
+        center_y = self.canvas.canvasy(view_h / 2) / self.zoom
+        
+        self.zoom = zoom
+        self.zoom_label.configure(text=f"{zoom * 100:g}%")
+        region = self.update_scrollregion()
+        
+        # Rola a vista para que o ponto central continue centralizado.
+        if region:
+            x0, y0, x1, y1 = region
+            self.canvas.xview_moveto((center_x * zoom - view_w / 2 - x0) / (x1 - x0))
+            self.canvas.yview_moveto((center_y * zoom - view_h / 2 - y0) / (y1 - y0))
+        # Os elementos são renderizados depois da rolagem, pois com zoom > 1 só o recorte visível é ampliado.
+        for canvas_id in self.elements:
+            self.render_element(canvas_id)
+        self.draw_grid()
+
+    def step_zoom(self, direction):
+        """Avança (1) ou recua (-1) um nível na lista de zoom."""
+        smaller = [z for z in ZOOM_LEVELS if z < self.zoom]
+        larger = [z for z in ZOOM_LEVELS if z > self.zoom]
+        if direction > 0 and larger:
+            self.set_zoom(larger[0])
+        elif direction < 0 and smaller:
+            self.set_zoom(smaller[-1])
+
+    def zoom_to_fit(self):
+        """Escolhe o maior nível de zoom em que o display inteiro cabe na área visível."""
+        self._fit_pending = False
+        size = self.get_display_size()
+        view_w, view_h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if not size or view_w <= 1 or view_h <= 1: return
+        
+        width, height = size
+        fitting = [z for z in ZOOM_LEVELS if width * z <= view_w and height * z <= view_h]
+        self.set_zoom(fitting[-1] if fitting else ZOOM_LEVELS[0])
+
+    def update_scrollregion(self):
+        """Define a região rolável; displays menores que a vista ficam centralizados."""
+        size = self.get_display_size()
+        if not size: return None
+        
+        content_w, content_h = size[0] * self.zoom, size[1] * self.zoom
+        view_w = max(self.canvas.winfo_width(), 1)
+        view_h = max(self.canvas.winfo_height(), 1)
+        x0 = -max(view_w - content_w, 0) / 2
+        y0 = -max(view_h - content_h, 0) / 2
+        region = (x0, y0, x0 + max(content_w, view_w), y0 + max(content_h, view_h))
+        self.canvas.configure(scrollregion=region)
+        return region
+
+    def on_canvas_configure(self, event):
+        """Recalcula a região rolável e o grid quando o canvas muda de tamanho."""
+        if self.elements_frame is None:
+            return # Ainda na inicialização; o zoom inicial e o grid ficam para finish_startup.
+        if self._fit_pending:
+            self.zoom_to_fit()
+        else:
+            self.update_scrollregion()
+            self.refresh_visible_elements()
+            self.draw_grid()
+
+    def on_pan_start(self, event):
+        """Inicia o arraste da vista (pan) com o botão do meio."""
+        self.canvas.scan_mark(event.x, event.y)
+
+    def on_pan_move(self, event):
+        """Move a vista acompanhando o mouse e reposiciona o grid visível."""
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.refresh_visible_elements()
+        self.draw_grid()
+
+    def on_mouse_wheel(self, event):
+        """Rola a vista com a roda do mouse; com Ctrl pressionado, altera o zoom."""
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            direction = -1
+        else:
+            direction = 1
+        if event.state & 0x0004: # Ctrl
+            self.step_zoom(-direction)
+            return
+        if event.state & 0x0001: # Shift
+            self.canvas.xview_scroll(direction, "units")
+        else:
+            self.canvas.yview_scroll(direction, "units")
+        self.refresh_visible_elements()
+        self.draw_grid()
+
+    def get_visible_box(self, canvas_id, margin):
+        """Retorna o recorte (em pixels do elemento) que cobre a área visível, ou None sem ampliação.
+
+        'margin' é a fração da vista acrescentada em cada lado. Um elemento fora da vista fica com
+        um recorte de 1 pixel, então o custo de ampliar não depende do tamanho do display.
+        """
+        if self.zoom <= 1: return None
+        element = self.elements[canvas_id]
+        view_w, view_h = max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+        left = self.canvas.canvasx(0) - view_w * margin
+        top = self.canvas.canvasy(0) - view_h * margin
+        right = self.canvas.canvasx(view_w) + view_w * margin
+        bottom = self.canvas.canvasy(view_h) + view_h * margin
+        
+        w, h = self.pil_images[canvas_id].size
+        x0 = min(max(math.floor(left / self.zoom) - element['x'], 0), w - 1)
+        y0 = min(max(math.floor(top / self.zoom) - element['y'], 0), h - 1)
+        x1 = max(min(math.ceil(right / self.zoom) - element['x'], w), x0 + 1)
+        y1 = max(min(math.ceil(bottom / self.zoom) - element['y'], h), y0 + 1)
+        return (x0, y0, x1, y1)
+
+    def get_zoomed_image(self, canvas_id, box=None):
+        """Retorna a PhotoImage do elemento (ou do recorte 'box') no zoom atual, usando o cache (LRU) de variantes."""
+        key = (canvas_id, self.zoom, box)
+        tk_image = self._zoom_cache.get(key)
+        if tk_image is not None:
+            self._zoom_cache.move_to_end(key)
+            return tk_image
+        
+        pil_image = self.pil_images[canvas_id]
+        if box is not None:
+            pil_image = pil_image.crop(box)
+        if self.zoom != 1:
+            size = (max(1, round(pil_image.width * self.zoom)), max(1, round(pil_image.height * self.zoom)))
+            # NEAREST mantém os pixels nítidos ao ampliar; BOX é rápido e suave ao reduzir.
+            resample = Image.Resampling.NEAREST if self.zoom > 1 else Image.Resampling.BOX
+            pil_image = pil_image.resize(size, resample)
+        tk_image = ImageTk.PhotoImage(pil_image)
+        
+        self._zoom_cache[key] = tk_image
+        self._zoom_cache_pixels += pil_image.width * pil_image.height
+        # Descarta as variantes usadas há mais tempo; o limite é em pixels, não em quantidade.
+        while self._zoom_cache_pixels > ZOOM_CACHE_MAX_PIXELS and len(self._zoom_cache) > 1:
+            _, old_image = self._zoom_cache.popitem(last=False)
+            self._zoom_cache_pixels -= old_image.width() * old_image.height()
+        return tk_image
+
+    def forget_zoom_variants(self, canvas_id=None):
+        """Remove do cache as variantes de um elemento (ou de todos, se 'canvas_id' for None)."""
+        for key in [k for k in self._zoom_cache if canvas_id is None or k[0] == canvas_id]:
+            tk_image = self._zoom_cache.pop(key)
+            self._zoom_cache_pixels -= tk_image.width() * tk_image.height()
+
+    def render_element(self, canvas_id):
+        """Posiciona um elemento no canvas e exibe a variante da imagem para o zoom atual.
+
+        Com zoom > 1, só o recorte visível (mais ZOOM_CROP_MARGIN) é ampliado, e o item fica na
+        posição do recorte.
+        """
+        element = self.elements[canvas_id]
+        box = self.get_visible_box(canvas_id, ZOOM_CROP_MARGIN)
+        tk_image = self.get_zoomed_image(canvas_id, box)
+        self.canvas.itemconfigure(canvas_id, image=tk_image)
+        offset_x, offset_y = box[:2] if box else (0, 0)
+        self.canvas.coords(canvas_id, (element['x'] + offset_x) * self.zoom, (element['y'] + offset_y) * self.zoom)
+        self.tk_images[canvas_id] = tk_image
+        self._crops[canvas_id] = box
+
+    def refresh_visible_elements(self):
+        """Com zoom > 1, refaz o recorte dos elementos cuja área visível saiu do recorte exibido."""
+        if self.zoom <= 1: return
+        for canvas_id in self.elements:
+            crop = self._crops.get(canvas_id)
+            visible = self.get_visible_box(canvas_id, 0)
+            if (crop is None or visible[0] < crop[0] or visible[1] < crop[1]
+                    or visible[2] > crop[2] or visible[3] > crop[3]):
+                self.render_element(canvas_id)
+
+    def get_item_position(self, canvas_id):
+        """Retorna a posição (em pixels do display) de um elemento a partir do item no canvas."""
+        x, y = self.canvas.coords(canvas_id)
+        offset_x, offset_y = (self._crops.get(canvas_id) or (0, 0))[:2]
+        return x / self.zoom - offset_x, y / self.zoom - offset_y
+
+    def add_canvas_element(self, pil_image, element_data):
+        """Cria o item de um elemento no canvas e registra suas imagens. Retorna o ID do canvas."""
+        canvas_id = self.canvas.create_image(0, 0, anchor="nw", tags=("draggable", element_data['name']))
+        self.elements[canvas_id] = element_data
+        self.pil_images[canvas_id] = pil_image.convert("RGBA")
+        self.render_element(canvas_id)
+        self.update_budget_display()
+        return canvas_id
+
+    def forget_canvas_element(self, canvas_id):
+        """Remove um elemento do canvas, dos dicionários de controle e do cache de variantes."""
+        self.canvas.delete(canvas_id)
+        del self.elements[canvas_id]
+        del self.tk_images[canvas_id]
+        del self.pil_images[canvas_id]
+        self._crops.pop(canvas_id, None)
+        self.forget_zoom_variants(canvas_id)
+        self.update_budget_display()
+
+    def get_grid_image(self, step, width, height, color):
+        """Retorna (do cache ou renderizando) uma imagem de grid com linhas a cada 'step' pixels."""
+        key = (step, width, height, color)
+        tk_image = self._grid_cache.get(key)
+        if tk_image is not None:
+            self._grid_cache.move_to_end(key)
+            return tk_image
+        
+        from PIL import ImageDraw
+        
+        # Renderiza uma única célula e a repete (tile) por toda a imagem.
+        tile = Image.new("RGB", (step, step), DISPLAY_BG_COLOR)
+        tile_draw = ImageDraw.Draw(tile)
+        tile_draw.line((0, 0, step - 1, 0), fill=color)
+        tile_draw.line((0, 0, 0, step - 1), fill=color)
+        row = Image.new("RGB", (width, step), DISPLAY_BG_COLOR)
+        for x in range(0, width, step):
+            row.paste(tile, (x, 0))
+        sheet = Image.new("RGB", (width, height), DISPLAY_BG_COLOR)
+        for y in range(0, height, step):
+            sheet.paste(row, (0, y))
+        tk_image = ImageTk.PhotoImage(sheet)
+        
+        self._grid_cache[key] = tk_image
+        while len(self._grid_cache) > GRID_CACHE_SIZE:
+            self._grid_cache.popitem(last=False)
+        return tk_image
+
+    def draw_grid(self, spacing=10, color="#555555"):
+        """Exibe o grid de fundo do display para auxiliar no alinhamento.
+
+        O grid é uma única imagem que cobre apenas a área visível (mais uma célula), alinhada
+        ao passo do grid. Como o padrão é periódico, a mesma imagem em cache serve para qualquer
+        posição de rolagem, então redesenhar no pan, no zoom ou no redimensionamento é barato.
+        """
+        size = self.get_display_size()
+        if not size: return # Se os valores não forem números, não desenha o grid.
+        
+        # Nível de detalhe: em zooms pequenos, omite linhas para não poluir a tela.
+        while spacing * self.zoom < GRID_MIN_STEP_PX:
+            spacing *= 2
+        step = int(spacing * self.zoom)
+        content_w, content_h = int(size[0] * self.zoom), int(size[1] * self.zoom)
+        view_w = max(self.canvas.winfo_width(), 1)
+        view_h = max(self.canvas.winfo_height(), 1)
+        
+        # Canto superior esquerdo da área visível, alinhado ao passo do grid.
+        x0 = max(0, int(self.canvas.canvasx(0)) // step * step)
+        y0 = max(0, int(self.canvas.canvasy(0)) // step * step)
+        width = min(content_w - x0, (view_w // step + 2) * step)
+        height = min(content_h - y0, (view_h // step + 2) * step)
+        if width <= 0 or height <= 0: return
+        
+        state = (x0, y0, step, width, height, color)
+        if state == self._grid_state and self._grid_item is not None: return
+        self._grid_state = state
+        
+        tk_image = self.get_grid_image(step, width, height, color)
+        if self._grid_item is None:
+            self._grid_item = self.canvas.create_image(x0, y0, image=tk_image, anchor="nw", tags="grid_line")
+        else:
+            self.canvas.itemconfigure(self._grid_item, image=tk_image)
+            self.canvas.coords(self._grid_item, x0, y0)
             
         # Joga o grid para o fundo do canvas (atrás de todas as imagens).
         self.canvas.tag_lower("grid_line")
@@ -460,6 +879,7 @@ class App(ctk.CTk):
                 self.element_h_entry.delete(0, "end")
                 self.element_h_entry.insert(0, str(element['h']))
                 break
+        self.update_readout()
 
     def resize_selected_element(self):
         """Redimensiona a imagem do elemento selecionado para os novos valores de W e H."""
@@ -489,20 +909,13 @@ class App(ctk.CTk):
         new_pil_image = self.resize_image(element_data['path'], new_w, new_h)
         if not new_pil_image: return
         
-        # Cria uma nova imagem, apaga a antiga e a substitui no canvas e nos dicionários.
-        new_tk_image = ImageTk.PhotoImage(new_pil_image)
+        # Apaga a imagem antiga e a substitui no canvas e nos dicionários.
         new_x = (int(self.width_entry.get()) / 2) - (new_w / 2) # Centraliza a nova imagem.
         new_y = (int(self.height_entry.get()) / 2) - (new_h / 2)
         
-        self.canvas.delete(canvas_id_to_resize)
-        new_canvas_id = self.canvas.create_image(new_x, new_y, image=new_tk_image, anchor="nw", tags=("draggable", element_data['name']))
-        
-        # Atualiza os dicionários com os novos dados e o novo ID.
-        del self.elements[canvas_id_to_resize]
-        del self.tk_images[canvas_id_to_resize]
+        self.forget_canvas_element(canvas_id_to_resize)
         element_data.update({'w': new_w, 'h': new_h, 'x': int(new_x), 'y': int(new_y)})
-        self.elements[new_canvas_id] = element_data
-        self.tk_images[new_canvas_id] = new_tk_image
+        self.add_canvas_element(new_pil_image, element_data)
 
     def generate_output(self):
         """Chama a função de geração apropriada com base no tipo de armazenamento selecionado."""
@@ -514,101 +927,58 @@ class App(ctk.CTk):
             messagebox.showinfo(self.get_string("title_info"), self.get_string("info_no_elements_to_generate"))
             return
             
+        # Rastreamento opcional dos estágios, ativado por "trace_export": true no config.json.
+        tracer = ExportTracer(enabled=bool(self.config.get("trace_export", False)))
         if storage_type == self.get_string("internal_memory"):
-            self.generate_internal_memory_code(use_transparency)
+            self.generate_internal_memory_code(use_transparency, tracer)
         else:
-            self.generate_sd_card_files(use_transparency)
+            self.generate_sd_card_files(use_transparency, tracer)
 
-    def generate_internal_memory_code(self, use_transparency):
-        """Gera um header C++ (.h) com os dados das imagens em arrays uint16_t."""
-        TRANSPARENCY_COLOR_HEX = "0xF81F"
-        code_parts = ["// This code was generated by TFT Screen Layout Helper by Luiz F. R. Pimentel\n","// Mode: Internal Memory\n"]
-        if use_transparency:
-            code_parts.append(f"// Transparency activated with Color Key: {TRANSPARENCY_COLOR_HEX} (Magenta)\n")
-        
-        code_parts.extend(["\n#pragma once\n\n", "#include <TFT_eSPI.h>\n\n"])
-        draw_function_parts = ["void drawLayout(TFT_eSPI& tft) {\n"]
-        
-        for element in self.elements.values():
-            pil_image = self.resize_image(element['path'], element['w'], element['h'])
-            if not pil_image: return
-            
-            rgb565_array = self.convert_image_data(pil_image, use_transparency)
-            img_var_name = element['name'].replace('.', '_').replace('-', '_')
-            
-            # Cria a declaração do array de pixels.
-            code_parts.append(f"const uint16_t {img_var_name}_data[{len(rgb565_array)}] = {{\n  ")
-            pixel_parts = []
-            for i, p in enumerate(rgb565_array):
-                pixel_parts.append(f"0x{p:04X}, ")
-                # Adiciona uma quebra de linha a cada 16 pixels para melhor formatação.
-                if (i + 1) % 16 == 0 and i < len(rgb565_array) - 1:
-                    pixel_parts.append("\n  ")
-            code_parts.append("".join(pixel_parts))
-            code_parts.append("\n};\n\n")
-            
-            # Cria a chamada de função para desenhar a imagem.
-            draw_call = f"  tft.pushImage({element['x']}, {element['y']}, {element['w']}, {element['h']}, {img_var_name}_data"
-            if use_transparency:
-                draw_call += f", {TRANSPARENCY_COLOR_HEX}"
-            draw_call += ");\n"
-            draw_function_parts.append(draw_call)
-            
-        draw_function_parts.append("}\n")
-        final_code = "".join(code_parts) + "".join(draw_function_parts)
-        self.show_code_window(final_code)
+    def generate_internal_memory_code(self, use_transparency, tracer=NULL_TRACER):
+        """Gera um header C++ (.h) com os dados das imagens e o exibe na janela de código."""
+        try:
+            with tracer.span("export"):
+                final_code = build_internal_memory_code(self.elements.values(), use_transparency, self.get_budget_settings(), tracer)
+        except ImageProcessError as e:
+            messagebox.showerror(self.get_string("title_error"), self.get_string("error_image_process").format(path=e.path, e=e.error))
+            return
+        self.show_code_window(final_code, tracer)
 
-    def generate_sd_card_files(self, use_transparency):
-        """Gera arquivos binários (.RAW) para cada imagem e um JSON de layout."""
+    def generate_sd_card_files(self, use_transparency, tracer=NULL_TRACER):
+        """Gera os arquivos para o cartão SD na pasta escolhida pelo usuário."""
         output_folder = filedialog.askdirectory(title="Selecione a Pasta de Saída para o Cartão SD")
         if not output_folder: return
         
-        layout_data = {
-            'author': "Luiz F. R. Pimentel",
-            'github': "https://github.com/KanekiZLF",
-            'background': None, 
-            'icons': []
-        }
-        
-        for i, element in enumerate(self.elements.values()):
-            pil_image = self.resize_image(element['path'], element['w'], element['h'])
-            if not pil_image:
-                messagebox.showerror(self.get_string("title_error"), self.get_string("error_generation_aborted"))
-                return
-                
-            rgb565_array = self.convert_image_data(pil_image, use_transparency)
-            
-            # Cria um nome de arquivo compatível com sistemas de arquivos mais antigos (8.3).
-            base_name = element['name'].split('_')[-1].split('.')[0][:8]
-            output_filename = f"{base_name}.RAW"
-            output_filepath = os.path.join(output_folder, output_filename)
-            
-            try:
-                with open(output_filepath, 'wb') as f:
-                    for pixel in rgb565_array:
-                        # Empacota cada pixel como um 'unsigned short' big-endian.
-                        f.write(struct.pack('<H', pixel))
-            except IOError as e:
-                messagebox.showerror(self.get_string("title_error"), self.get_string("error_file_save").format(filepath=output_filepath, e=e))
-                return
-            
-            icon_data = {'file': output_filename, 'x': element['x'], 'y': element['y'], 'w': element['w'], 'h': element['h']}
-            if use_transparency:
-                icon_data['transparent'] = True
-            
-            # O primeiro elemento é considerado o fundo.
-            if i == 0:
-                layout_data['background'] = icon_data
-            else:
-                layout_data['icons'].append(icon_data)
-                
-        json_filepath = os.path.join(output_folder, f"Layout_{base_name}.JSON")
-        with open(json_filepath, 'w') as f:
-            json.dump(layout_data, f, indent=4)
+        try:
+            with tracer.span("export"):
+                write_sd_card_files(self.elements.values(), use_transparency, output_folder, self.get_budget_settings(), tracer)
+        except ImageProcessError as e:
+            messagebox.showerror(self.get_string("title_error"), self.get_string("error_image_process").format(path=e.path, e=e.error))
+            messagebox.showerror(self.get_string("title_error"), self.get_string("error_generation_aborted"))
+            return
+        except OSError as e:
+            messagebox.showerror(self.get_string("title_error"), self.get_string("error_file_save").format(filepath=e.filename, e=e))
+            return
             
+        self.finish_export_trace(tracer)
         messagebox.showinfo(self.get_string("title_success"), self.get_string("info_sd_files_success").format(folder=output_folder))
 
-    def show_code_window(self, code):
+    def finish_export_trace(self, tracer):
+        """Salva o rastreamento da exportação (formato Chrome Trace) e mostra o resumo no painel."""
+        if not tracer.enabled: return
+        
+        trace_filepath = self.config.get("trace_file", "export_trace.json")
+        try:
+            tracer.save(trace_filepath)
+        except OSError as e:
+            messagebox.showerror(self.get_string("title_error"), self.get_string("error_file_save").format(filepath=trace_filepath, e=e))
+        
+        summary = tracer.summary()
+        total = sum(summary[name]['time_ms'] for name in ("export", "textbox") if name in summary)
+        stages = " · ".join(f"{name} {data['time_ms']:.0f}" for name, data in summary.items() if name != "export")
+        self.trace_label.configure(text=self.get_string("trace_summary").format(total=total, stages=stages))
+
+    def show_code_window(self, code, tracer=NULL_TRACER):
         """Exibe uma nova janela com o código gerado e um botão para copiar."""
         code_window = ctk.CTkToplevel(self)
         code_window.title(self.get_string("code_generated_title"))
@@ -623,7 +993,9 @@ class App(ctk.CTk):
         
         textbox = ctk.CTkTextbox(main_frame, wrap="none", font=("Courier New", 10))
         textbox.grid(row=0, column=0, sticky="nsew")
-        textbox.insert("0.0", code)
+        with tracer.span("textbox") as span:
+            textbox.insert("0.0", code)
+            span.add_bytes(len(code))
         
         def copy_to_clipboard():
             """Copia o conteúdo da caixa de texto para a área de transferência."""
@@ -645,6 +1017,7 @@ class App(ctk.CTk):
         copy_button = ctk.CTkButton(main_frame, text=self.get_string("copy_button_text"), command=copy_to_clipboard)
         copy_button.grid(row=1, column=0, pady=(10,0), sticky="ew")
         
+        self.finish_export_trace(tracer)
         self.wait_window(code_window)
 
     def import_image(self):
@@ -658,16 +1031,13 @@ class App(ctk.CTk):
             messagebox.showerror(self.get_string("title_error"), self.get_string("error_file_open").format(e=e))
             return
             
-        tk_image = ImageTk.PhotoImage(pil_image)
         self.element_counter += 1
         basename = os.path.basename(filepath)
         safe_basename = basename.replace(' ', '_') # Garante que o nome não tenha espaços.
         name = f"img_{self.element_counter}_{safe_basename}"
         
         # Adiciona a imagem ao canvas e aos dicionários de controle.
-        canvas_id = self.canvas.create_image(10, 10, image=tk_image, anchor="nw", tags=("draggable", name))
-        self.elements[canvas_id] = {'name': name, 'path': filepath, 'x': 10, 'y': 10, 'w': pil_image.width, 'h': pil_image.height}
-        self.tk_images[canvas_id] = tk_image
+        self.add_canvas_element(pil_image, {'name': name, 'path': filepath, 'x': 10, 'y': 10, 'w': pil_image.width, 'h': pil_image.height})
         self.listbox.insert("end", name)
 
     def delete_selected(self):
@@ -683,12 +1053,11 @@ class App(ctk.CTk):
                 break
                 
         if item_to_delete:
-            self.canvas.delete(item_to_delete)
-            del self.elements[item_to_delete]
-            del self.tk_images[item_to_delete]
+            self.forget_canvas_element(item_to_delete)
             self.listbox.delete(selected_indices[0])
             self.element_w_entry.delete(0, "end")
             self.element_h_entry.delete(0, "end")
+            self.update_readout()
     
     def clear_all_elements(self):
         """Apaga todos os elementos do canvas e da lista, com confirmação do usuário."""
@@ -702,65 +1071,202 @@ class App(ctk.CTk):
         )
 
         if confirm:
-            self.canvas.delete("all") # Apaga todos os itens do canvas.
-            self.draw_grid() # Redesenha o grid, que também foi apagado.
+            self.canvas.delete("draggable") # Apaga os elementos do canvas; o grid é mantido.
             self.listbox.delete(0, "end") # Apaga todos os itens da listbox.
             self.elements.clear() # Limpa as estruturas de dados.
             self.tk_images.clear()
+            self.pil_images.clear()
+            self._key_runs_cache.clear()
+            self._crops.clear()
+            self.forget_zoom_variants()
+            self.update_budget_display()
             self.element_counter = 0 # Reinicia o contador.
             self.element_w_entry.delete(0, "end") # Limpa os campos de entrada.
             self.element_h_entry.delete(0, "end")
+            self.update_readout()
 
     def on_press(self, event):
         """Chamado quando um item arrastável é clicado."""
         try:
-            # Encontra o item mais próximo do clique.
-            canvas_id = self.canvas.find_closest(event.x, event.y)[0]
+            # Encontra o item sob o cursor.
+            canvas_id = self.canvas.find_withtag("current")[0]
         except IndexError:
             return # Clicou em uma área vazia do canvas.
             
         self._drag_data["item"] = canvas_id
-        self._drag_data["x"] = event.x
-        self._drag_data["y"] = event.y
+        self._drag_data["x"] = self.canvas.canvasx(event.x)
+        self._drag_data["y"] = self.canvas.canvasy(event.y)
+        self._last_drag_flush = time.perf_counter()
+        self._frame_times.clear()
+        self._frame_work_times.clear()
         
-        # Sincroniza a seleção do canvas com a listbox.
         element_data = self.elements.get(canvas_id)
         if element_data:
-            element_name = element_data['name']
-            all_items = list(self.listbox.get(0, "end"))
-            try:
-                index = all_items.index(element_name)
-                self.listbox.selection_clear(0, "end")
-                self.listbox.selection_set(index)
-                self.listbox.activate(index)
-                self.listbox.see(index) # Garante que o item selecionado esteja visível.
-                self.on_element_select() # Atualiza os campos de W e H.
-            except ValueError:
-                pass # O item do canvas não está na lista (não deve acontecer).
+            self.select_element_in_list(element_data['name'])
+            self.schedule_readout()
+
+    def select_element_in_list(self, element_name):
+        """Sincroniza a seleção da listbox com o elemento; não faz nada se ele já estiver selecionado."""
+        selected_indices = self.listbox.curselection()
+        if selected_indices and self.listbox.get(selected_indices[0]) == element_name:
+            return # Evita reescrever a lista e os campos W/H a cada clique no mesmo elemento.
+        
+        all_items = list(self.listbox.get(0, "end"))
+        try:
+            index = all_items.index(element_name)
+        except ValueError:
+            return # O item do canvas não está na lista (não deve acontecer).
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(index)
+        self.listbox.activate(index)
+        self.listbox.see(index) # Garante que o item selecionado esteja visível.
+        self.on_element_select() # Atualiza os campos de W e H.
 
     def on_drag(self, event):
-        """Chamado quando o mouse é movido com o botão pressionado sobre um item."""
-        if self._drag_data["item"]:
-            dx = event.x - self._drag_data["x"]
-            dy = event.y - self._drag_data["y"]
-            self.canvas.move(self._drag_data["item"], dx, dy)
-            self._drag_data["x"] = event.x
-            self._drag_data["y"] = event.y
+        """Chamado quando o mouse é movido com o botão pressionado sobre um item.
+
+        Apenas registra a posição; o canvas é atualizado no máximo uma vez por quadro
+        em flush_drag, não importa quantos eventos de movimento o mouse gere.
+        """
+        if not self._drag_data["item"]: return
+        
+        # Converte as coordenadas da janela para coordenadas do canvas (considera a rolagem).
+        self._pending_drag = (self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if self._drag_after_id is None:
+            elapsed_ms = (time.perf_counter() - self._last_drag_flush) * 1000
+            if elapsed_ms >= DRAG_FRAME_MS:
+                self._drag_after_id = self.after_idle(self.flush_drag)
+            else:
+                self._drag_after_id = self.after(int(DRAG_FRAME_MS - elapsed_ms), self.flush_drag)
+
+    def flush_drag(self):
+        """Aplica ao canvas o deslocamento acumulado desde a última atualização do arraste."""
+        self._drag_after_id = None
+        if not self._drag_data["item"] or self._pending_drag is None: return
+        
+        start = time.perf_counter()
+        x, y = self._pending_drag
+        self._pending_drag = None
+        dx = x - self._drag_data["x"]
+        dy = y - self._drag_data["y"]
+        self.canvas.move(self._drag_data["item"], dx, dy)
+        self._drag_data["x"] = x
+        self._drag_data["y"] = y
+        self.schedule_readout()
+        
+        # Registra o tempo de quadro para o overlay de depuração.
+        end = time.perf_counter()
+        self._frame_times.append((end - self._last_drag_flush) * 1000)
+        self._frame_work_times.append((end - start) * 1000)
+        del self._frame_times[:-30], self._frame_work_times[:-30] # Mantém só os quadros recentes.
+        self._last_drag_flush = end
+        if self._debug_overlay is not None:
+            self.update_debug_overlay()
 
     def on_release(self, event):
         """Chamado quando o botão do mouse é solto, finalizando o arraste."""
         if self._drag_data["item"]:
+            # Aplica o último movimento que ainda estava aguardando o próximo quadro.
+            if self._drag_after_id is not None:
+                self.after_cancel(self._drag_after_id)
+            self.flush_drag()
+            
             canvas_id = self._drag_data["item"]
             # Atualiza as coordenadas do elemento no dicionário de dados.
             if canvas_id in self.elements:
-                new_x, new_y = self.canvas.coords(canvas_id)
-                self.elements[canvas_id]['x'] = int(new_x)
-                self.elements[canvas_id]['y'] = int(new_y)
+                # Converte a posição no canvas para pixels do display e alinha o item a eles.
+                new_x, new_y = self.get_item_position(canvas_id)
+                self.elements[canvas_id]['x'] = round(new_x)
+                self.elements[canvas_id]['y'] = round(new_y)
+                self.render_element(canvas_id)
             # Limpa os dados de arraste.
             self._drag_data["item"] = None
             self._drag_data["x"] = 0
             self._drag_data["y"] = 0
-            
+            self.update_readout()
+
+    def get_selected_canvas_id(self):
+        """Retorna o ID do canvas do elemento selecionado na listbox, ou None."""
+        if self.elements_frame is None: return None
+        selected_indices = self.listbox.curselection()
+        if not selected_indices: return None
+        
+        selected_name = self.listbox.get(selected_indices[0])
+        for canvas_id, data in self.elements.items():
+            if data['name'] == selected_name:
+                return canvas_id
+        return None
+
+    def on_nudge(self, event, dx, dy, step):
+        """Acumula o deslocamento das setas do teclado; a repetição automática vira um único movimento."""
+        if isinstance(self.focus_get(), (tkinter.Entry, tkinter.Listbox)):
+            return # As setas pertencem ao campo com foco.
+        if self._drag_data["item"] or self.get_selected_canvas_id() is None:
+            return
+        
+        self._pending_nudge[0] += dx * step
+        self._pending_nudge[1] += dy * step
+        if self._nudge_after_id is None:
+            self._nudge_after_id = self.after(DRAG_FRAME_MS, self.flush_nudge)
+        return "break"
+
+    def flush_nudge(self):
+        """Aplica de uma só vez o deslocamento acumulado pelas setas ao elemento selecionado."""
+        self._nudge_after_id = None
+        dx, dy = self._pending_nudge
+        self._pending_nudge = [0, 0]
+        canvas_id = self.get_selected_canvas_id()
+        if canvas_id is None or (dx == 0 and dy == 0): return
+        
+        element = self.elements[canvas_id]
+        element['x'] += dx
+        element['y'] += dy
+        self.render_element(canvas_id)
+        self.schedule_readout()
+
+    def schedule_readout(self):
+        """Agenda a atualização da leitura de coordenadas, limitada a READOUT_INTERVAL_MS."""
+        if self._readout_after_id is None:
+            self._readout_after_id = self.after(READOUT_INTERVAL_MS, self.update_readout)
+
+    def update_readout(self):
+        """Mostra a posição (em pixels do display) do elemento sendo arrastado ou selecionado."""
+        if self._readout_after_id is not None:
+            self.after_cancel(self._readout_after_id)
+            self._readout_after_id = None
+        
+        canvas_id = self._drag_data["item"] or self.get_selected_canvas_id()
+        if canvas_id not in self.elements:
+            self.position_label.configure(text="")
+            return
+        if self._drag_data["item"]:
+            x, y = self.get_item_position(canvas_id)
+            x, y = round(x), round(y)
+        else:
+            x, y = self.elements[canvas_id]['x'], self.elements[canvas_id]['y']
+        self.position_label.configure(text=f"X: {x}  Y: {y}")
+
+    def toggle_debug_overlay(self, event=None):
+        """Liga/desliga o overlay de depuração com o tempo de quadro do arraste."""
+        if self._debug_overlay is None:
+            self._debug_overlay = self.canvas.create_text(0, 0, anchor="nw", fill="#00FF00", font=("Courier New", 9), tags="debug_overlay")
+            self.update_debug_overlay()
+        else:
+            self.canvas.delete(self._debug_overlay)
+            self._debug_overlay = None
+
+    def update_debug_overlay(self):
+        """Atualiza o texto do overlay com os tempos de quadro medidos no arraste."""
+        if self._frame_times:
+            frame_avg = sum(self._frame_times) / len(self._frame_times)
+            work_avg = sum(self._frame_work_times) / len(self._frame_work_times)
+            text = f"frame: {self._frame_times[-1]:.1f} ms (avg {frame_avg:.1f})\nupdate: {work_avg:.2f} ms"
+        else:
+            text = "frame: -\nupdate: -"
+        self.canvas.itemconfigure(self._debug_overlay, text=text)
+        self.canvas.coords(self._debug_overlay, self.canvas.canvasx(5), self.canvas.canvasy(5))
+        self.canvas.tag_raise(self._debug_overlay)
+
     def save_layout(self):
         """Salva o estado atual do canvas (elementos e suas propriedades) em um arquivo JSON."""
         if not self.elements:
@@ -825,12 +1331,8 @@ class App(ctk.CTk):
                 pil_image = self.resize_image(element_data['path'], element_data['w'], element_data['h'])
                 if not pil_image: continue
                 
-                tk_image = ImageTk.PhotoImage(pil_image)
                 name = element_data['name']
-                canvas_id = self.canvas.create_image(element_data['x'], element_data['y'], image=tk_image, anchor="nw", tags=("draggable", name))
-                
-                self.elements[canvas_id] = element_data
-                self.tk_images[canvas_id] = tk_image
+                self.add_canvas_element(pil_image, element_data)
                 self.listbox.insert("end", name)
 
                 # Atualiza o contador de elementos para evitar conflitos de nome.
@@ -845,7 +1347,174 @@ class App(ctk.CTk):
                 
         messagebox.showinfo(self.get_string("title_success"), self.get_string("info_layout_loaded_success"))
 
+# --- Modo Watch ---
+
+class LayoutWatcher:
+    """Acompanha um layout salvo e regenera só as saídas afetadas quando algo muda.
+
+    A cada verificação (polling), compara o layout JSON e o conteúdo das imagens de cada elemento
+    com a rodada anterior. Mudou a imagem, o tamanho ou a transparência: o .RAW (modo SD) ou o
+    array (modo interno) daquele elemento é refeito. Mudou só a posição: apenas o JSON de layout
+    ou o drawLayout é reescrito, reaproveitando os arrays em cache. Tudo é gravado com atomic_open.
+    """
+    def __init__(self, layout_path, mode, output_path, use_transparency, budget_settings=None, streaming=None):
+        self.layout_path = layout_path
+        self.mode = mode
+        self.output_path = output_path
+        self.use_transparency = use_transparency
+        self.budget_settings = budget_settings
+        self.streaming = streaming
+        self.elements = []
+        self._file_state = {}  # caminho -> (mtime_ns, tamanho, hash do conteúdo)
+        self._layout_state = None
+        self._outputs = {}  # nome do elemento -> (chave dos pixels, resultado gerado)
+        self._written_files = set()  # Arquivos gerados na pasta SD na última rodada.
+
+    def file_digest(self, path):
+        """Retorna o hash do conteúdo do arquivo; só relê o arquivo quando mtime ou tamanho mudam."""
+        import hashlib
+        
+        stat = os.stat(path)
+        cached = self._file_state.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        self._file_state[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def poll(self):
+        """Verifica mudanças e regenera o necessário. Retorna os nomes regenerados, ou None se nada mudou."""
+        stat = os.stat(self.layout_path)
+        layout_state = (stat.st_mtime_ns, stat.st_size)
+        layout_changed = layout_state != self._layout_state
+        if layout_changed:
+            try:
+                _, _, self.elements = load_layout_file(self.layout_path)
+            except (ValueError, KeyError):
+                return None # O editor ainda está gravando o layout; tenta na próxima rodada.
+            self._layout_state = layout_state
+        
+        changed = []
+        for element in self.elements:
+            # Tudo que altera os pixels gerados; a posição fica de fora.
+            pixel_key = (self.file_digest(element['path']), element['w'], element['h'], self.use_transparency)
+            previous = self._outputs.get(element['name'])
+            if previous is None or previous[0] != pixel_key:
+                changed.append((element, pixel_key))
+        if not changed and not layout_changed:
+            return None
+        
+        if self.mode == "sd":
+            os.makedirs(self.output_path, exist_ok=True)
+            for element, pixel_key in changed:
+                runs = write_raw_file(element, self.use_transparency, self.output_path, streaming=self.streaming)
+                self._outputs[element['name']] = (pixel_key, runs)
+            key_runs = {e['name']: self._outputs[e['name']][1] for e in self.elements}
+            json_filepath = write_sd_layout_json(self.elements, self.use_transparency, self.output_path, self.budget_settings, key_runs)
+            
+            # Apaga o que a rodada anterior gerou e esta não gera mais (.RAW de elementos removidos e o
+            # Layout_*.JSON antigo, que leva o nome do último elemento), para o dispositivo não ler um layout velho.
+            written_files = {get_raw_filename(e['name']) for e in self.elements} | {os.path.basename(json_filepath)}
+            for filename in self._written_files - written_files:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.output_path, filename))
+            self._written_files = written_files
+        else:
+            for element, pixel_key in changed:
+                self._outputs[element['name']] = (pixel_key, render_c_array(element, self.use_transparency, streaming=self.streaming))
+            cached_arrays = {e['name']: self._outputs[e['name']][1] for e in self.elements}
+            with atomic_open(self.output_path, 'w', encoding='utf-8') as f:
+                write_internal_memory_code(f, self.elements, self.use_transparency, self.budget_settings, cached_arrays=cached_arrays)
+        
+        # Esquece elementos removidos do layout.
+        names = {e['name'] for e in self.elements}
+        for name in [n for n in self._outputs if n not in names]:
+            del self._outputs[name]
+        return [element['name'] for element, _ in changed]
+
+    def run(self, interval=0.5):
+        """Verifica o layout a cada 'interval' segundos até Ctrl+C."""
+        print(f"Watching {self.layout_path} -> {self.output_path} (Ctrl+C to stop)")
+        last_error = None
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    regenerated = self.poll()
+                    last_error = None
+                except (ImageProcessError, OSError, ValueError, KeyError) as e:
+                    # Um layout editado pela metade (elemento sem 'path', lista vazia...) não encerra o watch.
+                    # O mesmo erro só é mostrado uma vez, até o layout mudar.
+                    error = f"{type(e).__name__}: {e}"
+                    if error != last_error:
+                        print(f"[{time.strftime('%H:%M:%S')}] Error: {error}", file=sys.stderr)
+                    last_error = error
+                    regenerated = None
+                if regenerated is not None:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    print(f"[{time.strftime('%H:%M:%S')}] regenerated {len(regenerated)} element(s) {', '.join(regenerated)} in {elapsed_ms:.0f} ms", flush=True)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+# --- Linha de Comando ---
+
+def parse_args(argv=None):
+    """Lê os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="TFT Screen Layout Helper")
+    parser.add_argument("--export", metavar="LAYOUT", help="Gera as saídas de um layout salvo sem abrir a interface (modo batch).")
+    parser.add_argument("--watch", metavar="LAYOUT", help="Regenera as saídas afetadas sempre que o layout ou suas imagens mudarem.")
+    parser.add_argument("--interval", type=float, default=0.5, help="Intervalo (s) entre verificações no modo --watch.")
+    parser.add_argument("--mode", choices=("internal", "sd"), default="internal", help="Tipo de memória de saída.")
+    parser.add_argument("--out", help="Arquivo .h (internal) ou pasta (sd) de saída.")
+    parser.add_argument("--transparency", action="store_true", help="Usa transparência (Color Key).")
+    parser.add_argument("--stream", action="store_true", help="Redimensiona todas as imagens por faixas. Evita a cópia RGBA da origem, mas ela ainda é decodificada inteira: o pico de memória depende do tamanho da origem.")
+    parser.add_argument("--profile-startup", action="store_true", help="Mede o tempo até o primeiro quadro da janela e encerra.")
+    return parser.parse_args(argv)
+
+def run_batch_export(args):
+    """Gera o header ou os arquivos do cartão SD de um layout salvo, sem interface gráfica."""
+    if not args.out:
+        print("--out is required with --export", file=sys.stderr)
+        return 2
+    config = load_config()
+    budget_settings = {**DEFAULT_BUDGET_SETTINGS, **config.get("budget", {})}
+    streaming = True if args.stream else None
+    try:
+        _, _, elements = load_layout_file(args.export)
+        if not elements:
+            print(TRANSLATIONS["en"]["info_no_elements_to_generate"], file=sys.stderr)
+            return 1
+        if args.mode == "internal":
+            with atomic_open(args.out, 'w', encoding='utf-8') as f:
+                write_internal_memory_code(f, elements, args.transparency, budget_settings, streaming=streaming)
+        else:
+            os.makedirs(args.out, exist_ok=True)
+            write_sd_card_files(elements, args.transparency, args.out, budget_settings, streaming=streaming)
+    except (ImageProcessError, OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(args.out)
+    return 0
+
+def run_watch(args):
+    """Inicia o modo watch para um layout salvo."""
+    if not args.out:
+        print("--out is required with --watch", file=sys.stderr)
+        return 2
+    config = load_config()
+    budget_settings = {**DEFAULT_BUDGET_SETTINGS, **config.get("budget", {})}
+    watcher = LayoutWatcher(args.watch, args.mode, args.out, args.transparency, budget_settings, True if args.stream else None)
+    watcher.run(args.interval)
+    return 0
+
 # Ponto de entrada da aplicação.
 if __name__ == "__main__":
-    app = App()
+    args = parse_args()
+    if args.export:
+        sys.exit(run_batch_export(args))
+    if args.watch:
+        sys.exit(run_watch(args))
+    app = App(profile_startup=args.profile_startup)
     app.mainloop()
\ No newline at end of file